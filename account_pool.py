@@ -0,0 +1,92 @@
+# account_pool.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import config_loader
+from record_cache import RecordCache
+from record_index import ContentIndex
+from ttl_cache import TTLCache
+
+class AccountSession:
+    """
+    单个账户的常驻状态: API 客户端 (连接池)、本地记录缓存、内存记录缓存和反查索引。
+    切换账户时保留, 切回时无需重新建立连接或重新下载记录。
+    """
+
+    def __init__(self, name, email, api_key, client_factory, cache_factory, dns_cache_size, dns_cache_ttl):
+        self.name = name
+        self.email = email
+        self.api_key = api_key
+        self.api = client_factory(email, api_key)
+        self.record_cache = cache_factory(email)
+        self.dns_cache = TTLCache(dns_cache_size, dns_cache_ttl)
+        self.content_index = ContentIndex()
+        self.zones = []
+
+    def close(self):
+        self.api.close()
+        self.record_cache.close()
+
+class AccountPool:
+    """
+    按账户名称保存 AccountSession, 首次使用时创建。凭据变化时重新创建该账户的会话。
+    run_all 可在多个账户上并发执行同一操作 (如导出、反查)。
+    """
+    DNS_CACHE_SIZE = 256
+    DNS_CACHE_TTL = 300
+
+    def __init__(self, client_factory=None, cache_factory=RecordCache,
+                 dns_cache_size=DNS_CACHE_SIZE, dns_cache_ttl=DNS_CACHE_TTL):
+        if client_factory is None:
+            from network.cloudflare_api import CloudflareAPI
+            client_factory = CloudflareAPI
+        self._client_factory = client_factory
+        self._cache_factory = cache_factory
+        self._dns_cache_size = dns_cache_size
+        self._dns_cache_ttl = dns_cache_ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return config_loader.list_accounts()
+
+    def get(self, name=None) -> AccountSession:
+        """返回账户 (默认当前账户) 的会话; 账户不存在时抛出 KeyError, 凭据无效时抛出 ValueError"""
+        name = name or config_loader.current_account()
+        email, api_key = config_loader.load_config(name)
+        if not email or not api_key:
+            raise KeyError(name)
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is not None and (session.email, session.api_key) == (email, api_key):
+                return session
+            stale = session
+            session = AccountSession(name, email, api_key, self._client_factory, self._cache_factory,
+                                     self._dns_cache_size, self._dns_cache_ttl)
+            self._sessions[name] = session
+        if stale is not None:
+            stale.close()
+        return session
+
+    def sessions(self, names=None):
+        """返回多个账户的会话, names 为空时为全部账户"""
+        return [self.get(name) for name in (names or self.names())]
+
+    def run_all(self, func, names=None, workers=4):
+        """在各账户上并发执行 func(session), 返回 {账户名称: 结果}"""
+        sessions = self.sessions(names)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sessions) or 1))) as executor:
+            results = executor.map(func, sessions)
+            return {session.name: result for session, result in zip(sessions, results)}
+
+    def discard(self, name):
+        """关闭并移除账户的会话 (例如账户被删除之后)"""
+        with self._lock:
+            session = self._sessions.pop(name, None)
+        if session is not None:
+            session.close()
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
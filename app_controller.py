@@ -1,20 +1,35 @@
 # app_controller.py
-import threading
-import queue
 from network.cloudflare_api import CloudflareAPI
 import config_loader
+from account_pool import AccountPool
 from network.get_ip_api import get_public_ip
+from network.rate_limit import background_requests
+from dns_sync import import_records, replace_content
+from prefetch import Prefetcher
+from task_pool import TaskPool
+from ui_dispatch import MainLoopDispatcher
 from gi.repository import GLib
 from ui import gtk_ui
 
 class AppController:
+    DNS_CACHE_SIZE = 256    # 内存中最多保留的域名记录数
+    DNS_CACHE_TTL = 300     # 记录缓存的有效期 (秒), 过期后先显示旧数据再后台刷新
+    PREFETCH_ENABLED = True # 加载域名列表后在后台预取各域名的记录
+    PREFETCH_LIMIT = None   # 只预取最近使用的 N 个域名, None 表示全部 (不超过 DNS_CACHE_SIZE)
+    PREFETCH_WORKERS = 2    # 预取使用的工作线程数
+    TASK_WORKERS = 6        # 前台任务共享线程池的大小
+    RECORDS_SLOT = "zone_records"  # "当前域名记录" 槽位, 新请求会取代旧请求
+
     def __init__(self, app):
         self.app = app
-        self.api = None
-        self.zones = []
+        # 每个账户保留自己的 API 客户端、本地缓存、内存缓存和反查索引, 切换账户时不必重新下载
+        self.accounts = AccountPool(dns_cache_size=self.DNS_CACHE_SIZE, dns_cache_ttl=self.DNS_CACHE_TTL)
+        self.session = None
         self.current_zone = None
-        self.dns_cache = {}
-        self.callback_queue = queue.Queue()
+        self.prefetcher = Prefetcher(self._prefetch_records, self._on_prefetched, self.PREFETCH_WORKERS)
+        # 工作线程的结果在就绪时立即交给 GTK 主循环, 不再定时轮询
+        self.dispatcher = MainLoopDispatcher(GLib.idle_add)
+        self.task_pool = TaskPool(self.dispatcher.post, self.TASK_WORKERS)
         self.ui = None
 
         # 对于GTK, app是Adw.Application, UI在 'activate'信号时创建
@@ -24,83 +39,182 @@ class AppController:
         # GTK应用的激活回调
         self.ui = gtk_ui.AppUI(app, self)
         self.initialize_app()
-        self.process_queue()
+
+    # 以下属性均指向当前账户的会话
+    @property
+    def api(self):
+        return self.session.api if self.session else None
+
+    @property
+    def record_cache(self):
+        return self.session.record_cache if self.session else None
+
+    @property
+    def dns_cache(self):
+        return self.session.dns_cache if self.session else None
+
+    @property
+    def content_index(self):
+        return self.session.content_index if self.session else None
+
+    @property
+    def zones(self):
+        return self.session.zones if self.session else []
+
+    @zones.setter
+    def zones(self, value):
+        if self.session:
+            self.session.zones = value
 
     def get_main_window(self):
         # 返回顶层窗口对象
         return self.ui
 
-    def process_queue(self):
-        try:
-            while True:
-                callback, kwargs = self.callback_queue.get_nowait()
-                callback(**kwargs)
-        except queue.Empty:
-            pass
-        finally:
-            GLib.timeout_add(100, self.process_queue)
-
-    def threaded_task(self, task_func, callback_func, callback_kwargs=None):
-        # 在后台线程中执行任务
-        if callback_kwargs is None:
-            callback_kwargs = {}
-        def worker():
-            result, error = task_func()
-            final_kwargs = {"result": result, "error": error, **callback_kwargs}
-            self.callback_queue.put((callback_func, final_kwargs))
-        threading.Thread(target=worker, daemon=True).start()
+    def threaded_task(self, task_func, callback_func, callback_kwargs=None, slot=None, key=None):
+        # 在共享线程池中执行任务; slot 相同的新任务会取代旧任务, key 相同的并发任务只执行一次
+        return self.task_pool.submit(task_func, callback_func, callback_kwargs, slot=slot, key=key)
 
     def initialize_app(self):
-        # 初始化或重置应用状态
+        # 初始化或重置应用状态, 使用当前账户的会话 (已打开过的账户直接复用)
         self.ui.clear_ui()
-        email, key = config_loader.load_config()
-        if email and key:
-            try:
-                self.api = CloudflareAPI(email, key)
-                self.load_domains()
-            except ValueError as e:
-                self.ui.set_status_message(f"错误: {e}")
-                self.prompt_for_config()
-        else:
+        self.prefetcher.cancel_all()
+        self.task_pool.cancel_slot(self.RECORDS_SLOT)
+        self.current_zone = None
+        self.ui.update_account_list(self.accounts.names(), config_loader.current_account())
+        try:
+            self.session = self.accounts.get()
+        except KeyError:
             self.prompt_for_config()
+            return
+        except ValueError as e:
+            self.ui.set_status_message(f"错误: {e}")
+            self.prompt_for_config()
+            return
+        if self.zones:
+            # 之前打开过该账户, 域名列表和记录缓存仍在内存中
+            self.ui.update_domain_list(self.zones, None)
+        else:
+            self._show_cached_domains()
+        self.load_domains(expire=False)
+
+    def account_names(self):
+        return self.accounts.names()
+
+    def switch_account(self, name):
+        # 切换到另一个已保存的账户
+        if self.session and self.session.name == name:
+            return
+        if config_loader.set_current_account(name):
+            self.initialize_app()
+
+    def add_account(self):
+        # 添加新账户, 保存后自动切换到该账户
+        self.ui.set_status_message("请输入新账户的Cloudflare API信息")
+        gtk_ui.ConfigEditor(self.get_main_window(), self, new_account=True)
 
     def prompt_for_config(self):
         # 弹出API配置窗口
         self.ui.set_status_message("请输入您的Cloudflare API信息")
         gtk_ui.ConfigEditor(self.get_main_window(), self)
 
-    def test_and_save_config(self, email, key, editor_window):
-        # 测试并保存API配置
+    def test_and_save_config(self, email, key, editor_window, account=None):
+        # 测试并保存API配置; account 为账户名称, 为空时保存到当前账户 (没有账户时以邮箱命名)
         editor_window.show_status("正在验证凭据...", "blue")
         temp_api = CloudflareAPI(email, key)
         self.threaded_task(
             task_func=temp_api.get_zones,
             callback_func=self._on_config_test_done,
-            callback_kwargs={"email": email, "key": key, "editor_window": editor_window}
+            callback_kwargs={"email": email, "key": key, "editor_window": editor_window, "account": account}
         )
 
-    def _on_config_test_done(self, result, error, email, key, editor_window):
+    def _on_config_test_done(self, result, error, email, key, editor_window, account=None):
         # 配置测试完成后的回调
         if not editor_window.is_active(): return
         if error:
             editor_window.show_status(f"连接失败: {error}", "red")
         else:
-            config_loader.save_config(email, key)
+            config_loader.save_config(email, key, account or config_loader.current_account())
             editor_window.close_editor()
             self.ui.set_status_message("凭据验证成功，正在加载数据...")
             self.initialize_app()
 
-    def load_domains(self):
-        # 加载域名列表
+    def _show_cached_domains(self):
+        # 先显示本地缓存中的域名列表, 随后由 load_domains 在后台校验
+        cached_zones = self.record_cache.get_zones()
+        if cached_zones:
+            self.zones = cached_zones
+            self.ui.update_domain_list(self.zones, None)
+            # 在后台读取全部缓存记录构建反查索引
+            session = self.session
+            self.threaded_task(lambda: (session.record_cache.get_all_records(), None), self._index_cached_records,
+                               {"session": session}, key=("cached_records", session.name))
+
+    def _index_cached_records(self, result, error, session, **kwargs):
+        # 只补充尚未索引的域名, 已由 API 获取的数据更新
+        names = {zone['id']: zone['name'] for zone in session.zones}
+        for zone_id, records in (result or {}).items():
+            if zone_id not in session.content_index:
+                session.content_index.update_zone(zone_id, records, names.get(zone_id))
+
+    def _zone_name(self, zone_id):
+        return next((zone['name'] for zone in self.zones if zone['id'] == zone_id), None)
+
+    def load_domains(self, expire=True):
+        # 加载域名列表; 切换账户时 expire 为 False, 仍在有效期内的记录不会被重新获取
         if not self.api: return
         self.ui.set_status_message("正在加载域名...")
-        self.dns_cache.clear()
-        self.threaded_task(self.api.get_zones, self._update_domain_list_callback)
+        if expire:
+            # 只标记为过期, 再次选择域名时先显示旧记录并在后台刷新
+            self.dns_cache.expire_all()
+        session = self.session
+        self.threaded_task(lambda: self._fetch_zones(session), self._update_domain_list_callback,
+                           {"session": session}, slot="zones", key=("zones", session.name))
+
+    def _fetch_zones(self, session):
+        # 后台线程: 获取域名列表并写入本地缓存
+        zones, error = session.api.get_zones()
+        if not error:
+            session.record_cache.save_zones(zones)
+        return zones, error
 
-    def _update_domain_list_callback(self, result, error, **kwargs):
+    def _update_domain_list_callback(self, result, error, session=None, **kwargs):
+        if session is not self.session:
+            # 请求期间已切换账户
+            if not error:
+                session.zones = result
+            return
+        if error and self.zones:
+            # 校验失败时继续显示缓存中的域名列表
+            self.ui.set_status_message(f"更新域名列表失败 (当前显示缓存数据): {error}")
+            return
+        unchanged = not error and bool(self.zones) and [(z['id'], z['name']) for z in result] == [(z['id'], z['name']) for z in self.zones]
         self.zones = result if not error else []
-        self.ui.update_domain_list(self.zones, error)
-        self.ui.set_status_message("请从左侧选择一个域名" if not error else f"加载域名失败: {error}")
+        if not unchanged:
+            self.ui.update_domain_list(self.zones, error)
+        if not self.current_zone or not unchanged:
+            self.ui.set_status_message("请从左侧选择一个域名" if not error else f"加载域名失败: {error}")
+        if not error:
+            self.start_prefetch()
+
+    def start_prefetch(self):
+        # 按最近使用顺序在后台预取各域名的记录, 已有新鲜缓存的域名跳过
+        if not self.PREFETCH_ENABLED or not self.zones: return
+        limit = min(self.PREFETCH_LIMIT or len(self.zones), self.DNS_CACHE_SIZE)
+        zone_ids = [zone['id'] for zone in self.zones]
+        recent = self.record_cache.recent_zone_ids() if self.record_cache else []
+        known = set(zone_ids)
+        ordered = [zid for zid in recent if zid in known]
+        seen = set(ordered)
+        ordered += [zid for zid in zone_ids if zid not in seen]
+        targets = [zid for zid in ordered[:limit] if not self.dns_cache.lookup(zid)[1]]
+        # 排队时记下所属账户, 切换账户后仍在队列中的域名不会用新账户的客户端获取
+        self.prefetcher.schedule(targets, context=self.session)
+
+    def _on_prefetched(self, zone_id, result, error, session):
+        # 预取线程完成后交给主线程处理; 若正好是当前域名则按后台校验的方式更新视图
+        self.dispatcher.post(self._handle_api_dns_response,
+                             {"result": result, "error": error, "zone_id": zone_id, "revalidate": True,
+                              "session": session})
 
     def on_domain_selected(self, selected_index):
         # 处理域名选择事件
@@ -109,23 +223,164 @@ class AppController:
         self.current_zone = zone
         self.ui.set_status_message(f"当前域名: {zone['name']}")
         self.ui.set_record_buttons_state(True)
-        if zone['id'] in self.dns_cache:
-            self.ui.update_dns_records_list(self.dns_cache[zone['id']], None)
-        else:
+        # 之前域名尚未完成的记录请求已无意义; 该域名由前台直接获取, 不再等待预取队列
+        self.task_pool.cancel_slot(self.RECORDS_SLOT)
+        self.prefetcher.discard(zone['id'])
+        if self.record_cache:
+            self.record_cache.touch_zone(zone['id'])
+        records, fresh = self.dns_cache.lookup(zone['id'])
+        if records is None and self.record_cache:
+            # 内存中没有时使用本地缓存, 视为过期数据
+            records = self.record_cache.get_records(zone['id'])
+            if records is not None:
+                self.dns_cache.set(zone['id'], records, fresh=False)
+                if zone['id'] not in self.content_index:
+                    self.content_index.update_zone(zone['id'], records, zone['name'])
+        if records is None:
             self.refresh_current_records()
+            return
+        self.ui.update_dns_records_list(records, None)
+        if not fresh:
+            # stale-while-revalidate: 先显示旧数据, 后台获取到新数据后再替换
+            self._revalidate_records(zone['id'])
 
     def refresh_current_records(self):
-        # 刷新当前域名的DNS记录
+        # 刷新当前域名的DNS记录, 已有数据时保持显示直到新数据到达
         if not self.current_zone: return
         zone_id = self.current_zone['id']
-        if zone_id in self.dns_cache: del self.dns_cache[zone_id]
-        self.ui.show_loading_records()
-        self.threaded_task(lambda: self.api.get_dns_records(zone_id), self._handle_api_dns_response)
+        if zone_id in self.dns_cache:
+            self.ui.set_status_message(f"正在刷新 {self.current_zone['name']} 的记录...")
+            self._revalidate_records(zone_id)
+        else:
+            self.ui.show_loading_records()
+            self._submit_fetch_records(zone_id, revalidate=False)
+
+    def _revalidate_records(self, zone_id):
+        self._submit_fetch_records(zone_id, revalidate=True)
+
+    def _submit_fetch_records(self, zone_id, revalidate):
+        session = self.session
+        self.threaded_task(lambda: self._fetch_records(zone_id, session), self._handle_api_dns_response,
+                           {"zone_id": zone_id, "revalidate": revalidate, "session": session},
+                           slot=self.RECORDS_SLOT, key=("records", session.name, zone_id))
+
+    def _prefetch_records(self, zone_id, session):
+        # 预取线程: 与前台对同一域名的请求合并为一次网络调用; session 为排队时的账户
+        # 预取为后台请求, 接近限速时让位于用户操作
+        with background_requests():
+            return self.task_pool.call(("records", session.name, zone_id),
+                                       lambda: self._fetch_records(zone_id, session))
+
+    def _fetch_records(self, zone_id, session):
+        # 后台线程: 获取记录并与本地缓存比对, 返回 ((records, changed), error)
+        records, error = session.api.get_dns_records(zone_id)
+        if error:
+            return None, error
+        changed = session.record_cache.sync_records(zone_id, records)
+        return (records, changed), None
+
+    def _handle_api_dns_response(self, result, error, zone_id, revalidate=False, session=None, **kwargs):
+        records, changed = result if result else (None, True)
+        session = session or self.session
+        if not error:
+            # 写入发起请求的账户; 请求期间切换了账户时结果仍会保留给原账户
+            session.dns_cache[zone_id] = records
+            if changed or zone_id not in session.content_index:
+                zone_name = next((zone['name'] for zone in session.zones if zone['id'] == zone_id), None)
+                session.content_index.update_zone(zone_id, records, zone_name)
+        if session is not self.session or not self.current_zone or self.current_zone['id'] != zone_id:
+            return
+        if revalidate:
+            # 后台校验: 出错时保留缓存内容, 没有变化时不重绘
+            if error:
+                self.ui.set_status_message(f"更新记录失败 (当前显示缓存数据): {error}")
+                return
+            self.ui.set_status_message(f"当前域名: {self.current_zone['name']}")
+            if not changed:
+                return
+        self.ui.update_dns_records_list(records, error)
+
+    def cache_stats(self):
+        # 当前账户记录缓存的命中/未命中/淘汰计数, 用于诊断
+        return self.dns_cache.stats() if self.dns_cache else {}
+
+    def rate_limit_stats(self):
+        # API 请求调度的统计: 请求数、因限速等待的次数、收到 429 的次数和重试次数, 用于诊断
+        return self.api.rate_limit_stats() if self.api else {}
+
+    def dispatch_latency_stats(self):
+        # 从后台任务完成到主线程执行回调的延迟分布, 用于诊断
+        return self.dispatcher.latency_stats()
 
-    def _handle_api_dns_response(self, result, error, **kwargs):
-        if not error and self.current_zone:
-            self.dns_cache[self.current_zone['id']] = result
-        self.ui.update_dns_records_list(result, error)
+    def open_reverse_lookup(self):
+        # 打开跨域名反查窗口
+        if self.api:
+            gtk_ui.ReverseLookupWindow(self.get_main_window(), self)
+
+    def reverse_lookup(self, content):
+        # 在已缓存的记录中查找内容为 content 的记录, 返回 ([(zone_id, zone_name, record)], 已索引的域名数)
+        matches = [(zone_id, self.content_index.zone_name(zone_id) or zone_id, record)
+                   for zone_id, record in self.content_index.lookup(content)]
+        indexed = sum(1 for zone in self.zones if zone['id'] in self.content_index)
+        return matches, indexed
+
+    def replace_records_content(self, matches, new_content, window):
+        # 将反查到的记录批量改为新内容, 完成后重新获取涉及的域名
+        if not self.show_confirmation("确认修改", f"将 {len(matches)} 条记录的内容改为 {new_content} ？"):
+            return
+        pairs = [(zone_id, record) for zone_id, _, record in matches]
+
+        def on_progress(done, total):
+            self.dispatcher.post(window.show_status, {"text": f"正在修改... {done}/{total}"})
+
+        session = self.session
+
+        def task_func():
+            result, error = replace_content(session.api, pairs, new_content, progress_callback=on_progress)
+            for zone_id, summary in (result or {}).items():
+                self._persist_changes(session, zone_id, updated=self._returned_records(summary))
+            return result, error
+
+        self.threaded_task(task_func, self._handle_replace_response,
+                           {"window": window, "matches": matches, "session": session})
+
+    @staticmethod
+    def _returned_records(summary):
+        # bulk_mutate 结果中由 API 返回的完整记录
+        return [res for _, _, res in summary['succeeded'] if isinstance(res, dict) and 'id' in res]
+
+    def _handle_replace_response(self, result, error, window, matches, session):
+        if result is None:
+            self.show_message("修改失败", f"发生错误: {error}", "error")
+            return
+        names = {record['id']: f"{record['name']} ({zone_name})" for _, zone_name, record in matches}
+        succeeded = sum(len(summary['succeeded']) for summary in result.values())
+        message = f"已修改 {succeeded} 条记录。"
+        failures = [f"{names.get(item['id'], item['id'])}: {err}"
+                    for summary in result.values() for _, item, err in summary['failed']]
+        if failures:
+            message += f"\n以下 {len(failures)} 条修改失败:\n" + "\n".join(failures)
+        self.show_message("修改完成", message, "error" if error else "info")
+        for zone_id, summary in result.items():
+            self._write_through(zone_id, self._returned_records(summary), session=session)
+        window.refresh()
+
+    def _write_through(self, zone_id, updated=(), removed=(), session=None):
+        # 将修改结果直接写入内存缓存、反查索引和当前视图, 无需重新获取整个域名 (本地缓存已由后台线程写入)
+        session = session or self.session
+        records, fresh = session.dns_cache.lookup(zone_id)
+        if records is None:
+            records, fresh = session.record_cache.get_records(zone_id), False
+        if records is None:
+            return
+        by_id = {record['id']: record for record in updated}
+        removed = set(removed)
+        records = [by_id.pop(r['id'], r) for r in records if r['id'] not in removed] + list(by_id.values())
+        session.dns_cache.set(zone_id, records, fresh=fresh)
+        zone_name = next((zone['name'] for zone in session.zones if zone['id'] == zone_id), None)
+        session.content_index.update_zone(zone_id, records, zone_name)
+        if session is self.session and self.current_zone and self.current_zone['id'] == zone_id:
+            self.ui.update_dns_records_list(records, None)
 
     def open_add_record_window(self):
         # 打开添加记录的窗口
@@ -161,42 +416,143 @@ class AppController:
             return
         
         record_data['content'] = result
-        self.ui.set_status_message(f"已获取IP: {result}，正在添加记录...")
+        self.ui.set_status_message(f"已获取IP: {result}，正在{'更新' if record_id else '添加'}记录...")
         self._execute_add_or_update(record_data, record_id)
 
     def _execute_add_or_update(self, record_data, record_id):
-        # 核心的记录添加/更新逻辑
-        name = self.current_zone['name'] if record_data['name'] == '@' else f"{record_data['name']}.{self.current_zone['name']}"
-        
-        if record_id: # 更新逻辑 (未来实现)
-            pass
-        else: # 添加逻辑
-            task_func = lambda: self.api.add_dns_record(
-                zone_id=self.current_zone['id'], record_type=record_data['type'],
-                name=name, content=record_data['content'], proxied=record_data['proxied'])
-            
-        self.threaded_task(task_func, self._handle_modify_response)
+        # 核心的记录添加/更新逻辑; 完成后把 API 返回的记录直接写入缓存, 不重新获取整个域名
+        zone, session = self.current_zone, self.session
+        name = self._full_name(record_data['name'], zone['name'])
+
+        def task_func():
+            if record_id: # 更新逻辑: PATCH 就地修改, 未提交的字段 (如 TTL) 保持不变
+                record, error = session.api.update_dns_record(
+                    zone['id'], record_id, type=record_data['type'], name=name,
+                    content=record_data['content'], proxied=record_data['proxied'])
+            else: # 添加逻辑
+                data, error = session.api.add_dns_record(
+                    zone_id=zone['id'], record_type=record_data['type'],
+                    name=name, content=record_data['content'], proxied=record_data['proxied'])
+                record = data['result'] if data else None
+            if not error:
+                self._persist_changes(session, zone['id'], updated=[record])
+            return record, error
+
+        self.threaded_task(task_func, self._handle_modify_response, {"zone_id": zone['id'], "session": session})
+
+    @staticmethod
+    def _full_name(name, zone_name):
+        # 主机名可写 @、前缀或完整域名
+        name = name.rstrip('.')
+        if name == '@' or name.lower() == zone_name:
+            return zone_name
+        if name.lower().endswith('.' + zone_name):
+            return name
+        return f"{name}.{zone_name}"
+
+    @staticmethod
+    def _persist_changes(session, zone_id, updated=(), removed=()):
+        # 后台线程: 将修改结果写入本地缓存
+        if updated:
+            session.record_cache.upsert_records(zone_id, updated)
+        if removed:
+            session.record_cache.delete_records(zone_id, removed)
+
+    def open_edit_record_window(self):
+        # 编辑选中的 (第一条) 记录
+        if not self.current_zone: return
+        record_id, _ = self.ui.get_selected_record_info()
+        records = self.dns_cache.get(self.current_zone['id']) or []
+        record = next((r for r in records if r['id'] == record_id), None)
+        if record:
+            gtk_ui.RecordEditor(self.get_main_window(), self, record)
+
+    def open_import_dialog(self):
+        # 选择文件并将其中的记录导入当前域名
+        if self.current_zone:
+            self.ui.choose_import_file(self.import_records)
+
+    def import_records(self, path):
+        # 比较文件与线上记录, 只提交需要新增/删除的部分
+        if not self.current_zone: return
+        prune = self.show_confirmation("导入记录", "是否同时删除文件中不存在的线上记录？\n选择“取消”则只新增记录。")
+        zone = self.current_zone
+        live_records = self.dns_cache.get(zone['id'])
+        self.ui.set_status_message("正在导入记录...")
+
+        def on_progress(done, total):
+            self.dispatcher.post(self.ui.set_status_message, {"text": f"正在导入记录... {done}/{total}"})
+
+        task_func = lambda: import_records(self.api, zone, path, prune=prune, live_records=live_records,
+                                           progress_callback=on_progress)
+        self.threaded_task(task_func, self._handle_import_response)
+
+    def _handle_import_response(self, result, error, **kwargs):
+        # 导入完成后汇总结果
+        if result is None:
+            self.show_message("导入失败", f"发生错误: {error}", "error")
+            return
+        if not result['adds'] and not result['deletes']:
+            self.show_message("导入完成", "线上记录已与文件一致, 无需修改。", "info")
+            return
+        message = (f"计划新增 {len(result['adds'])} 条, 删除 {len(result['deletes'])} 条。\n"
+                   f"成功 {len(result['succeeded'])} 项, 失败 {len(result['failed'])} 项。")
+        if result['failed']:
+            message += "\n" + "\n".join(f"{item.get('name') or item.get('id')}: {err}"
+                                          for _, item, err in result['failed'])
+        self.show_message("导入完成", message, "error" if error else "info")
+        if result['succeeded']:
+            self.refresh_current_records()
 
     def on_record_selection_change(self, selection_exists):
         # 当DNS记录的选择状态改变时调用
         self.ui.set_delete_button_state(selection_exists)
 
     def delete_selected_record(self):
-        # 删除选中的DNS记录
-        record_id, record_name = self.ui.get_selected_record_info()
-        if not record_id: return
+        # 删除选中的DNS记录, 支持多选批量删除
+        selected = self.ui.get_selected_records_info()
+        if not selected: return
 
-        if self.show_confirmation("确认删除", f"您确定要永久删除记录 '{record_name}' 吗？\n此操作无法撤销。"):
-            task_func = lambda: self.api.delete_dns_record(zone_id=self.current_zone['id'], record_id=record_id)
-            self.threaded_task(task_func, self._handle_modify_response)
+        if len(selected) == 1:
+            message = f"您确定要永久删除记录 '{selected[0][1]}' 吗？\n此操作无法撤销。"
+        else:
+            message = f"您确定要永久删除选中的 {len(selected)} 条记录吗？\n此操作无法撤销。"
+        if not self.show_confirmation("确认删除", message):
+            return
+
+        zone_id, session = self.current_zone['id'], self.session
+        record_ids = [record_id for record_id, _ in selected]
+        names = dict(selected)
+
+        def on_progress(done, total):
+            self.dispatcher.post(self.ui.set_status_message, {"text": f"正在删除记录... {done}/{total}"})
+
+        def task_func():
+            result, error = session.api.bulk_delete_dns_records(zone_id, record_ids, progress_callback=on_progress)
+            self._persist_changes(session, zone_id, removed=[item['id'] for _, item, _ in result['succeeded']])
+            return result, error
 
-    def _handle_modify_response(self, result, error, **kwargs):
-        # 处理添加/删除/更新API调用后的响应
+        self.threaded_task(task_func, self._handle_bulk_delete_response,
+                           {"names": names, "zone_id": zone_id, "session": session})
+
+    def _handle_bulk_delete_response(self, result, error, names, zone_id, session):
+        # 批量删除完成后汇总每条记录的结果
+        if error:
+            failures = "\n".join(f"{names.get(item['id'], item['id'])}: {err}" for _, item, err in result['failed'])
+            self.show_message("部分删除失败",
+                              f"成功删除 {len(result['succeeded'])} 条, 失败 {len(result['failed'])} 条:\n{failures}", "error")
+        else:
+            self.show_message("操作成功", f"已删除 {len(result['succeeded'])} 条记录。", "info")
+        if result['succeeded']:
+            self._write_through(zone_id, removed=[item['id'] for _, item, _ in result['succeeded']], session=session)
+
+    def _handle_modify_response(self, result, error, zone_id, session, **kwargs):
+        # 处理添加/更新API调用后的响应, 返回的记录直接写入缓存和当前视图
         if error:
             self.show_message("操作失败", f"发生错误: {error}", "error")
         else:
             self.show_message("操作成功", "DNS记录已更新。", "info")
-            self.refresh_current_records()
+            self._write_through(zone_id, [result], session=session)
 
     def show_message(self, title, message, msg_type='info'):
         # 显示信息/错误对话框
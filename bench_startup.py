@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_startup.py
+"""
+启动耗时基准: 多次启动全新进程, 统计从启动到可用的时间 (毫秒)。
+  cli-help     cli-manager.py --help 输出完毕 (子命令在 shell 循环中调用的固定开销)
+  cli-prompt   main.py --cli 显示第一个输入提示
+  gui-window   main.py 的主窗口第一次显示 (需要图形环境和 GTK)
+每次运行都使用临时的 HOME, 不读取也不修改真实配置。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 在子进程中启动 GUI, 主窗口映射到屏幕后输出 "ready" 并退出
+GUI_PROBE = """
+import sys
+sys.path.insert(0, {app_dir!r})
+sys.argv = ["main.py"]
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import GLib, Adw
+from app_controller import AppController
+
+app = Adw.Application(application_id="org.niylin.cloudflare-dns-manager.bench")
+controller = AppController(app)
+
+def on_activate(app):
+    window = controller.get_main_window()
+    def on_map(widget):
+        print("ready", flush=True)
+        GLib.idle_add(app.quit)
+    if window.get_mapped():
+        on_map(window)
+    else:
+        window.connect("map", on_map)
+
+app.connect_after("activate", on_activate)
+app.run(None)
+"""
+
+def time_until(cmd, marker, env, stdin=subprocess.DEVNULL):
+    """启动 cmd, 返回输出中出现 marker 所用的毫秒数; 未出现时返回 None"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, cwd=APP_DIR)
+    output = b""
+    try:
+        while marker not in output:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                return None
+            output += chunk
+        return (time.perf_counter() - start) * 1000
+    finally:
+        proc.kill()
+        proc.wait()
+
+def run_case(name, runs, env):
+    python = sys.executable
+    if name == "cli-help":
+        return [time_until([python, "cli-manager.py", "--help"], b"usage", env) for _ in range(runs)]
+    if name == "cli-prompt":
+        # 临时 HOME 中没有配置, 第一个提示是输入邮箱; 需要一个不会结束的 stdin 才会等待输入
+        return [time_until([python, "main.py", "--cli"], "邮箱".encode(), env, stdin=subprocess.PIPE)
+                for _ in range(runs)]
+    if name == "gui-window":
+        probe = GUI_PROBE.format(app_dir=APP_DIR)
+        return [time_until([python, "-c", probe], b"ready", env) for _ in range(runs)]
+    raise ValueError(name)
+
+def main():
+    parser = argparse.ArgumentParser(description="测量 CLI 和 GUI 的启动耗时")
+    parser.add_argument("cases", nargs="*", default=["cli-help", "cli-prompt", "gui-window"],
+                        help="要测量的项目 (默认全部): cli-help, cli-prompt, gui-window")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="每项启动的次数 (默认 10)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+        for name in args.cases:
+            samples = [t for t in run_case(name, args.runs, env) if t is not None]
+            if not samples:
+                print(f"{name:12} 未能完成 (缺少依赖或图形环境?)")
+                continue
+            print(f"{name:12} 中位数 {statistics.median(samples):7.1f} ms  最小 {min(samples):7.1f} ms  "
+                  f"最大 {max(samples):7.1f} ms  ({len(samples)}/{args.runs} 次)")
+
+if __name__ == "__main__":
+    main()
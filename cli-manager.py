@@ -1,31 +1,575 @@
 #!/usr/bin/env python3
 
+import argparse
+import json
 import os
 import sys
-import time
-from colorama import Fore, Style, init
-from config_loader import load_config, save_config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config_loader import load_config, save_config, list_accounts, current_account, set_current_account, remove_account
+from account_pool import AccountPool
 from network.cloudflare_api import CloudflareAPI
 from network.get_ip_api import get_public_ip
+from record_cache import RecordCache
+from record_index import RecordSearchIndex, ContentIndex
+from dns_sync import import_records, desired_records_from_file, plan_changes, plan_is_empty, format_plan, apply_plan, replace_content, to_payload
+from zone_files import EXPORT_FORMATS, NDJSON_EXTENSIONS, export_zones, make_record
+from ddns import DDNS_CONFIG_PATH, DDNSUpdater, load_ddns_config
 
-init(autoreset=True)
+class _NoColor:
+    """colorama 加载之前 (子命令) 使用的空颜色代码, 输出保持为纯文本"""
+    def __getattr__(self, name):
+        return ""
+
+Fore = Style = _NoColor()
+
+def enable_colors():
+    """交互菜单才需要颜色, 到这时才导入 colorama。"""
+    global Fore, Style
+    from colorama import Fore, Style, init
+    init(autoreset=True)
+
+# 清屏并将光标移到左上角; 直接输出 ANSI 转义序列, 无需启动 clear/cls 子进程 (Windows 由 colorama 转换)
+CLEAR_SCREEN = "\033[2J\033[H"
 
 def print_header(title=""):
     """清屏并打印统一的程序标题。"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    print(CLEAR_SCREEN, end="")
     print(f"{Fore.CYAN}--- Cloudflare Dns Manager-CLI ---{Style.RESET_ALL}")
     if title:
         print(f"\n{title}")
 
-def handle_error(message, sleep_duration=1.5):
+def pause():
+    """交互模式下等待用户确认后再刷新屏幕; 输入不是终端时直接继续。"""
+    if sys.stdin.isatty():
+        input("按回车继续...")
+
+def handle_error(message):
     """打印错误消息并暂停。"""
     print(f"{Fore.RED}{message}")
-    time.sleep(sleep_duration)
+    pause()
+
+def emit(obj):
+    """以 NDJSON 输出一行结果。"""
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+def print_progress(done, total):
+    """在同一行刷新批量操作进度。"""
+    print(f"\r进度: {done}/{total}", end="", flush=True)
+
+def print_failures(summary, records=()):
+    """逐条打印批量操作中失败的记录。"""
+    if not summary['failed']:
+        return
+    names = {r['id']: r['name'] for r in records}
+    print(f"{Fore.RED}以下 {len(summary['failed'])} 项操作失败:")
+    for action, item, error in summary['failed']:
+        label = names.get(item.get('id')) or item.get('name') or item.get('id')
+        print(f"{Fore.RED}  [{action}] {label}: {error}")
+
+def fail(message, code=1):
+    """非交互模式下输出错误到 stderr 并退出。"""
+    print(message, file=sys.stderr)
+    sys.exit(code)
+
+# 每个账户一个常驻会话 (客户端连接池 + 本地记录缓存), 多账户子命令共用
+ACCOUNTS = AccountPool()
+
+def account_names(args) -> list:
+    """按 -a/--all-accounts 得到要操作的账户名称, 未指定时为当前账户。"""
+    names = list_accounts()
+    if not names:
+        fail("未找到 Cloudflare 配置, 请先以交互模式运行一次完成设置。")
+    if args.all_accounts:
+        return names
+    selected = args.account or [current_account()]
+    missing = [name for name in selected if name not in names]
+    if missing:
+        fail(f"未找到账户: {', '.join(missing)}")
+    return selected
+
+def open_sessions(names) -> list:
+    """打开各账户的会话, 凭据无效时退出。"""
+    try:
+        return ACCOUNTS.sessions(names)
+    except (KeyError, ValueError) as e:
+        fail(f"错误: {e}")
+
+def open_session(args):
+    """非交互模式下打开单个账户的会话, 不会提示输入。"""
+    names = account_names(args)
+    if len(names) > 1:
+        fail(f"{args.command} 子命令一次只能操作一个账户")
+    return open_sessions(names)[0]
+
+def load_api_or_exit(args) -> CloudflareAPI:
+    """非交互模式下读取已保存的配置并返回所选账户的客户端。"""
+    return open_session(args).api
+
+def run_accounts(func, names, workers=4) -> dict:
+    """在多个账户上并发执行 func(session), 返回 {账户名称: 结果}。"""
+    open_sessions(names)
+    return ACCOUNTS.run_all(func, names, workers)
+
+def select_zones(cf_api: CloudflareAPI, names) -> list:
+    """按域名筛选区域, names 为空时返回全部区域。"""
+    zones, error = cf_api.get_zones()
+    if error:
+        fail(f"获取域名列表失败: {error}")
+    if not names:
+        return zones
+    by_name = {zone["name"]: zone for zone in zones}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        fail(f"未找到域名: {', '.join(missing)}")
+    return [by_name[name] for name in names]
+
+def report_export(zone, count, error):
+    """输出单个区域的导出结果。"""
+    if error:
+        print(error, file=sys.stderr)
+    else:
+        print(f"{zone['name']}: 已导出 {count} 条记录", file=sys.stderr)
+
+def cmd_export(args) -> int:
+    """export 子命令: 将区域记录流式导出为 BIND 或 NDJSON 文件; 多个账户时并发导出到 <输出目录>/<账户名称>/。"""
+    names = account_names(args)
+    if len(names) == 1:
+        cf_api = load_api_or_exit(args)
+        zones = select_zones(cf_api, args.zones)
+        results = export_zones(cf_api, zones, args.output, args.format, args.workers, on_done=report_export)
+        return 1 if any(error for _, error in results.values()) else 0
+
+    def export_account(session):
+        zones, error = session.api.get_zones()
+        if error:
+            return set(), f"{session.name}: 获取域名列表失败: {error}"
+        if args.zones:
+            zones = [zone for zone in zones if zone["name"] in args.zones]
+        out_dir = os.path.join(args.output, session.name.replace(os.sep, "_"))
+        results = export_zones(session.api, zones, out_dir, args.format, args.workers, on_done=report_export)
+        failed = any(error for _, error in results.values())
+        return set(results), f"{session.name}: 部分域名导出失败" if failed else None
+
+    exit_code = 0
+    exported = set()
+    for zone_names, error in run_accounts(export_account, names).values():
+        exported |= zone_names
+        if error:
+            print(error, file=sys.stderr)
+            exit_code = 1
+    missing = [name for name in args.zones if name not in exported]
+    if missing:
+        print(f"未找到域名: {', '.join(missing)}", file=sys.stderr)
+        exit_code = 1
+    return exit_code
+
+def zone_name_from_path(path: str) -> str:
+    """由目标状态文件名推断域名, 如 example.com.zone -> example.com。"""
+    name = os.path.basename(path)
+    root, ext = os.path.splitext(name)
+    return root if ext.lower() in {".zone", ".csv", ".txt", *NDJSON_EXTENSIONS} else name
+
+def plan_zone(cf_api: CloudflareAPI, zone: dict, path: str):
+    """获取线上记录并与目标状态文件比较, 返回 (plan, error)。"""
+    live_records, error = cf_api.get_dns_records(zone["id"])
+    if error:
+        return None, f"{zone['name']}: 获取解析记录失败: {error}"
+    try:
+        return plan_changes(live_records, desired_records_from_file(path, zone["name"]), zone["name"]), None
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return None, f"{zone['name']}: 读取 {path} 失败: {e}"
+
+def cmd_plan(args) -> int:
+    """plan / apply 子命令: 按目标状态文件计算并 (可选) 执行最少的修改。"""
+    if args.zone and len(args.files) > 1:
+        fail("--zone 只能与单个文件一起使用")
+    cf_api = load_api_or_exit(args)
+    names = [args.zone or zone_name_from_path(path) for path in args.files]
+    zones = select_zones(cf_api, names)
+
+    exit_code = 0
+    for zone, path in zip(zones, args.files):
+        plan, error = plan_zone(cf_api, zone, path)
+        if error:
+            print(error, file=sys.stderr)
+            exit_code = 1
+            continue
+
+        print(f"# {zone['name']}: 新增 {len(plan['create'])}, 修改 {len(plan['update'])}, 删除 {len(plan['delete'])}")
+        for line in format_plan(plan):
+            print(line)
+        if args.command != "apply" or plan_is_empty(plan):
+            continue
+
+        summary, error = apply_plan(cf_api, zone["id"], plan)
+        print(f"# {zone['name']}: 成功 {len(summary['succeeded'])} 项, 失败 {len(summary['failed'])} 项")
+        for action, item, err in summary["failed"]:
+            print(f"{zone['name']}: [{action}] {item.get('name') or item.get('id')}: {err}", file=sys.stderr)
+        if error:
+            exit_code = 1
+    return exit_code
+
+def build_content_index(cf_api: CloudflareAPI, cache: RecordCache, refresh=False, workers=4) -> ContentIndex:
+    """由本地缓存构建跨域名反查索引; 未缓存的域名 (或 refresh 时全部域名) 从 API 获取并写入缓存。"""
+    zones = None if refresh else cache.get_zones()
+    if zones is None:
+        zones, error = fetch_zones(cf_api, cache)
+        if error:
+            fail(f"获取域名列表失败: {error}")
+    cached = {} if refresh else cache.get_all_records()
+    index = ContentIndex()
+    missing = []
+    for zone in zones:
+        if zone["id"] in cached or (not refresh and cache.get_records(zone["id"]) is not None):
+            index.update_zone(zone["id"], cached.get(zone["id"], []), zone["name"])
+        else:
+            missing.append(zone)
+    if missing:
+        print(f"正在获取 {len(missing)} 个未缓存域名的记录...", file=sys.stderr)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda zone: fetch_records(cf_api, cache, zone["id"]), missing)
+            for zone, (records, error) in zip(missing, results):
+                if error:
+                    print(f"{zone['name']}: 获取解析记录失败: {error}", file=sys.stderr)
+                else:
+                    index.update_zone(zone["id"], records, zone["name"])
+    return index
+
+def cmd_lookup(args) -> int:
+    """
+    lookup 子命令: 跨域名查找内容为指定 IP/目标的记录, 可批量替换为新内容。
+    多个账户时并发构建各账户的索引, 输出的第一列为账户名称。
+    """
+    names = account_names(args)
+    indexes = run_accounts(lambda session: build_content_index(session.api, session.record_cache, refresh=args.refresh),
+                           names)
+    found = {name: index.lookup(args.content, types=args.type) for name, index in indexes.items()}
+    for name, matches in found.items():
+        prefix = f"{name}\t" if len(names) > 1 else ""
+        for zone_id, record in matches:
+            print(f"{prefix}{indexes[name].zone_name(zone_id)}\t{record['name']}\t{record['type']}\t{record['content']}")
+    total = sum(len(matches) for matches in found.values())
+    print(f"# 共 {total} 条记录", file=sys.stderr)
+    if not args.replace or not total:
+        return 0
+
+    if not args.yes and input(f"将以上 {total} 条记录的内容改为 {args.replace} ? (y/N): ").strip().lower() != "y":
+        return 0
+    exit_code = 0
+    for name, matches in found.items():
+        if not matches:
+            continue
+        session, index = ACCOUNTS.get(name), indexes[name]
+        results, error = replace_content(session.api, matches, args.replace, progress_callback=print_progress)
+        print()
+        record_names = {record["id"]: record["name"] for _, record in matches}
+        succeeded = sum(len(summary["succeeded"]) for summary in results.values())
+        print(f"# {name}: 成功修改 {succeeded} 条记录", file=sys.stderr)
+        for zone_id, summary in results.items():
+            for action, item, err in summary["failed"]:
+                print(f"{index.zone_name(zone_id)}: {record_names.get(item['id'], item['id'])}: {err}", file=sys.stderr)
+            # 修改后的记录有新的 modified_on, 重新获取以更新本地缓存
+            if summary["succeeded"]:
+                fetch_records(session.api, session.record_cache, zone_id)
+        if error:
+            exit_code = 1
+    return exit_code
+
+def cmd_ddns(args) -> int:
+    """ddns 子命令: 按配置持续检查公网地址, 只在地址变化时更新记录。"""
+    try:
+        targets, interval, sources = load_ddns_config(args.config)
+    except FileNotFoundError:
+        fail(f"未找到 DDNS 配置文件: {args.config}")
+    except (OSError, ValueError) as e:
+        fail(f"读取 DDNS 配置失败: {e}")
+    session = open_session(args)
+    updater = DDNSUpdater(session.api, targets, interval=args.interval or interval, cache=session.record_cache, sources=sources,
+                          log=lambda message: print(message, file=sys.stderr, flush=True))
+    try:
+        return 0 if updater.run(once=args.once) else 1
+    except KeyboardInterrupt:
+        return 0
+
+def select_zone(cf_api: CloudflareAPI, name: str) -> dict:
+    """按域名查找单个区域。"""
+    return select_zones(cf_api, [name])[0]
+
+def zone_row(zone: dict, full: bool) -> dict:
+    return zone if full else {"id": zone["id"], "name": zone["name"], "status": zone.get("status")}
+
+def cmd_zones(args) -> int:
+    """zones 子命令: 以 NDJSON 逐页输出全部域名; 多个账户时并发获取, 每行附带 account 字段。"""
+    names = account_names(args)
+    if len(names) == 1:
+        cf_api = load_api_or_exit(args)
+        for zones, error in cf_api.iter_zones():
+            if error:
+                fail(f"获取域名列表失败: {error}")
+            for zone in zones:
+                emit(zone_row(zone, args.full))
+        return 0
+
+    exit_code = 0
+    for name, (zones, error) in run_accounts(lambda session: session.api.get_zones(), names).items():
+        if error:
+            print(f"{name}: 获取域名列表失败: {error}", file=sys.stderr)
+            exit_code = 1
+            continue
+        for zone in zones:
+            emit({**zone_row(zone, args.full), "account": name})
+    return exit_code
+
+def cmd_accounts(args) -> int:
+    """accounts 子命令: 列出 (NDJSON)、添加、切换或删除已保存的账户。"""
+    if args.action == "list":
+        current = current_account()
+        for name in list_accounts():
+            email, _ = load_config(name)
+            emit({"name": name, "email": email, "current": name == current})
+        return 0
+    if not args.name:
+        fail(f"accounts {args.action} 需要账户名称")
+    if args.action == "add":
+        email = input("Cloudflare 邮箱地址: ").strip()
+        api_key = input("Cloudflare Global API Key: ").strip()
+        try:
+            _, error = CloudflareAPI(email=email, api_key=api_key).get_zones()
+        except ValueError as e:
+            error = e
+        if error:
+            fail(f"验证凭据失败: {error}")
+        success, message = save_config(email, api_key, args.name, make_current=False)
+        print(message, file=sys.stderr)
+        return 0 if success else 1
+    if args.action == "use":
+        if not set_current_account(args.name):
+            fail(f"未找到账户: {args.name}")
+        return 0
+    if not remove_account(args.name):
+        fail(f"未找到账户: {args.name}")
+    return 0
+
+def cmd_records(args) -> int:
+    """records 子命令: 以 NDJSON 逐页输出域名的解析记录, 可按筛选条件过滤。"""
+    cf_api = load_api_or_exit(args)
+    zone = select_zone(cf_api, args.zone)
+    for records, error in cf_api.iter_dns_records(zone["id"]):
+        if error:
+            fail(f"{zone['name']}: 获取解析记录失败: {error}")
+        if args.query:
+            records = RecordSearchIndex(records).filter(args.query)
+        for record in records:
+            emit(record)
+    return 0
+
+def resolve_content(record_type: str, content: str):
+    """content 为 '+++' 时获取本机公网地址, 返回 (content, error)。"""
+    if content != "+++":
+        return content, None
+    return get_public_ip(version='v6' if record_type == "AAAA" else 'v4')
+
+def emit_summary(summary, zone_name: str, extra=None) -> bool:
+    """将 bulk_mutate 的结果逐项输出为 NDJSON, 全部成功时返回 True。"""
+    for action, item, result in summary["succeeded"]:
+        emit({"zone": zone_name, "action": action, "ok": True, "result": result, **(extra or {}).get(id(item), {})})
+    for action, item, error in summary["failed"]:
+        emit({"zone": zone_name, "action": action, "ok": False, "error": error, "item": item,
+              **(extra or {}).get(id(item), {})})
+    return not summary["failed"]
+
+def cmd_add(args) -> int:
+    """add 子命令: 添加一条记录并输出 API 返回的记录。"""
+    content, error = resolve_content(args.type.upper(), args.content)
+    if error:
+        fail(error)
+    cf_api = load_api_or_exit(args)
+    zone = select_zone(cf_api, args.zone)
+    name = zone["name"] if args.name == "@" else args.name
+    record = make_record(args.type, name, content, ttl=args.ttl, proxied=args.proxied, priority=args.priority)
+    summary, _ = cf_api.bulk_mutate(zone["id"], posts=[to_payload(record)])
+    return 0 if emit_summary(summary, zone["name"]) else 1
+
+def cmd_delete(args) -> int:
+    """delete 子命令: 按记录 ID, 或按名称/类型匹配删除记录。"""
+    if not args.ids and not args.name:
+        fail("请指定记录 ID, 或使用 --name 按名称匹配")
+    cf_api = load_api_or_exit(args)
+    zone = select_zone(cf_api, args.zone)
+    record_ids = list(args.ids)
+    if args.name:
+        records, error = cf_api.get_dns_records(zone["id"])
+        if error:
+            fail(f"{zone['name']}: 获取解析记录失败: {error}")
+        name = zone["name"] if args.name == "@" else args.name.rstrip(".").lower()
+        record_ids += [r["id"] for r in records if r["name"].lower() == name
+                       and (not args.type or r["type"] == args.type.upper())
+                       and (not args.content or r["content"] == args.content)]
+    if not record_ids:
+        fail("没有匹配的记录")
+    summary, _ = cf_api.bulk_delete_dns_records(zone["id"], record_ids)
+    return 0 if emit_summary(summary, zone["name"]) else 1
+
+BATCH_OPS = ("add", "update", "delete")
 
-def main():
+def parse_batch_line(line: str):
+    """解析批量输入中的一行 NDJSON 操作, 返回 (op, zone, item) 或抛出 ValueError。"""
+    op = json.loads(line)
+    if not isinstance(op, dict) or op.get("op") not in BATCH_OPS or not op.get("zone"):
+        raise ValueError(f"需要 op ({'/'.join(BATCH_OPS)}) 和 zone 字段")
+    fields = {k: v for k, v in op.items() if k not in ("op", "zone")}
+    if op["op"] == "add":
+        missing = [k for k in ("type", "name", "content") if k not in fields]
+        if missing:
+            raise ValueError(f"add 缺少字段: {', '.join(missing)}")
+        return op["op"], op["zone"], fields
+    if "id" not in fields:
+        raise ValueError(f"{op['op']} 需要 id 字段")
+    return op["op"], op["zone"], ({"id": fields["id"]} if op["op"] == "delete" else fields)
+
+def cmd_batch(args) -> int:
+    """
+    batch 子命令: 从标准输入读取 NDJSON 操作, 每行一个, 如
+      {"op": "add", "zone": "example.com", "type": "A", "name": "www", "content": "192.0.2.1"}
+      {"op": "update", "zone": "example.com", "id": "...", "content": "192.0.2.2"}
+      {"op": "delete", "zone": "example.com", "id": "..."}
+    同一域名的操作合并为批量请求, 全部共用同一个客户端; 每行输出一条带行号的 NDJSON 结果。
+    以流的方式处理: 某个域名积累满 BATCH_SIZE 项操作即提交并输出结果, 其余操作在输入结束后提交。
+    """
+    cf_api = load_api_or_exit(args)
+    zones, error = cf_api.get_zones()
+    if error:
+        fail(f"获取域名列表失败: {error}")
+    by_name = {zone["name"]: zone for zone in zones}
+
+    plans, extra, exit_code = {}, {}, 0
+
+    def flush(plan) -> bool:
+        summary, _ = cf_api.bulk_mutate(plan["zone"]["id"], deletes=plan["delete"], patches=plan["update"],
+                                        posts=plan["add"])
+        ok = emit_summary(summary, plan["zone"]["name"], extra)
+        sys.stdout.flush()
+        for op in BATCH_OPS:
+            for item in plan[op]:
+                extra.pop(id(item), None)
+            plan[op] = []
+        plan["pending"] = 0
+        return ok
+
+    for lineno, line in enumerate(sys.stdin, start=1):
+        if not line.strip():
+            continue
+        try:
+            op, zone_name, item = parse_batch_line(line)
+            zone = by_name.get(zone_name)
+            if zone is None:
+                raise ValueError(f"未找到域名: {zone_name}")
+            if op == "add":
+                content, error = resolve_content(item["type"].upper(), item["content"])
+                if error:
+                    raise ValueError(error)
+                name = zone["name"] if item["name"] == "@" else item["name"]
+                item = to_payload(make_record(item["type"], name, content, item.get("ttl", 1),
+                                              item.get("proxied", False), item.get("priority")))
+        except ValueError as e:
+            emit({"line": lineno, "ok": False, "error": str(e)})
+            exit_code = 1
+            continue
+        plan = plans.setdefault(zone["id"], {"zone": zone, "delete": [], "update": [], "add": [], "pending": 0})
+        plan[op].append(item)
+        plan["pending"] += 1
+        extra[id(item)] = {"line": lineno}
+        if plan["pending"] >= cf_api.BATCH_SIZE and not flush(plan):
+            exit_code = 1
+
+    for plan in plans.values():
+        if plan["pending"] and not flush(plan):
+            exit_code = 1
+    return exit_code
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Cloudflare Dns Manager-CLI, 不带子命令时进入交互菜单")
+    parser.add_argument("-a", "--account", action="append", help="使用指定账户 (默认当前账户); zones/export/lookup 可重复指定")
+    parser.add_argument("-A", "--all-accounts", action="store_true", help="zones/export/lookup 在全部账户上并发执行")
+    subparsers = parser.add_subparsers(dest="command")
+
+    accounts_parser = subparsers.add_parser("accounts", help="管理已保存的账户")
+    accounts_parser.add_argument("action", nargs="?", choices=("list", "add", "use", "remove"), default="list",
+                                 help="list 列出账户 (默认), add 添加, use 设为当前账户, remove 删除")
+    accounts_parser.add_argument("name", nargs="?", help="账户名称")
+    accounts_parser.set_defaults(func=cmd_accounts)
+
+    zones_parser = subparsers.add_parser("zones", help="以 NDJSON 输出全部域名")
+    zones_parser.add_argument("--full", action="store_true", help="输出 API 返回的完整字段")
+    zones_parser.set_defaults(func=cmd_zones)
+
+    records_parser = subparsers.add_parser("records", help="以 NDJSON 输出域名的解析记录")
+    records_parser.add_argument("zone", help="域名")
+    records_parser.add_argument("-q", "--query", help="筛选条件, 如 'type:A proxied:yes www'")
+    records_parser.set_defaults(func=cmd_records)
+
+    add_parser = subparsers.add_parser("add", help="添加一条解析记录")
+    add_parser.add_argument("zone", help="域名")
+    add_parser.add_argument("type", help="记录类型, 如 A、AAAA、CNAME、TXT、MX")
+    add_parser.add_argument("name", help="完整主机名, @ 表示根域名")
+    add_parser.add_argument("content", help="记录内容, '+++' 表示本机公网地址")
+    add_parser.add_argument("--ttl", type=int, default=1, help="TTL, 1 为自动 (默认)")
+    add_parser.add_argument("--proxied", action="store_true", help="开启 Cloudflare 代理")
+    add_parser.add_argument("--priority", type=int, help="MX 等记录的优先级")
+    add_parser.set_defaults(func=cmd_add)
+
+    delete_parser = subparsers.add_parser("delete", help="删除解析记录")
+    delete_parser.add_argument("zone", help="域名")
+    delete_parser.add_argument("ids", nargs="*", help="要删除的记录 ID")
+    delete_parser.add_argument("--name", help="按完整主机名匹配要删除的记录, @ 表示根域名")
+    delete_parser.add_argument("-t", "--type", help="与 --name 一起使用, 只删除该类型")
+    delete_parser.add_argument("--content", help="与 --name 一起使用, 只删除内容相同的记录")
+    delete_parser.set_defaults(func=cmd_delete)
+
+    batch_parser = subparsers.add_parser("batch", help="从标准输入读取 NDJSON 操作批量执行")
+    batch_parser.set_defaults(func=cmd_batch)
+
+    export_parser = subparsers.add_parser("export", help="导出区域的全部解析记录")
+    export_parser.add_argument("zones", nargs="*", help="要导出的域名, 留空则导出全部域名")
+    export_parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="bind", help="导出格式 (默认 bind)")
+    export_parser.add_argument("-o", "--output", default=".", help="输出目录, 每个域名一个文件 (默认当前目录)")
+    export_parser.add_argument("-w", "--workers", type=int, default=4, help="并发导出的域名数 (默认 4)")
+    export_parser.set_defaults(func=cmd_export)
+
+    for command, help_text in (("plan", "比较目标状态文件与线上记录, 输出需要执行的修改"),
+                               ("apply", "计算并执行使线上记录与目标状态文件一致的修改")):
+        sync_parser = subparsers.add_parser(command, help=help_text)
+        sync_parser.add_argument("files", nargs="+", help="目标状态文件 (BIND/CSV/NDJSON), 文件名即域名, 如 example.com.zone")
+        sync_parser.add_argument("-z", "--zone", help="指定域名 (仅限单个文件)")
+        sync_parser.set_defaults(func=cmd_plan)
+
+    lookup_parser = subparsers.add_parser("lookup", help="跨域名查找指向某个 IP/目标的记录, 可批量替换")
+    lookup_parser.add_argument("content", help="要查找的记录内容, 如 203.0.113.10 或 origin.example.com")
+    lookup_parser.add_argument("-t", "--type", action="append", help="只查找指定类型, 可重复, 如 -t A -t AAAA")
+    lookup_parser.add_argument("--replace", metavar="NEW", help="将找到的记录内容全部改为 NEW")
+    lookup_parser.add_argument("-y", "--yes", action="store_true", help="替换时不再确认")
+    lookup_parser.add_argument("--refresh", action="store_true", help="忽略本地缓存, 重新获取全部域名的记录")
+    lookup_parser.set_defaults(func=cmd_lookup)
+
+    ddns_parser = subparsers.add_parser("ddns", help="动态 DNS: 公网地址变化时自动更新记录")
+    ddns_parser.add_argument("-c", "--config", default=DDNS_CONFIG_PATH, help=f"DDNS 配置文件 (默认 {DDNS_CONFIG_PATH})")
+    ddns_parser.add_argument("-i", "--interval", type=int, help="检查间隔 (秒), 覆盖配置文件中的 interval")
+    ddns_parser.add_argument("--once", action="store_true", help="只检查一次后退出, 适合由 cron/systemd timer 调用")
+    ddns_parser.set_defaults(func=cmd_ddns)
+    return parser
+
+def main(argv=None):
     """程序主入口。"""
-    email, api_key = load_config()
-    if not email or not api_key:
+    args = build_parser().parse_args(argv)
+    if args.command:
+        sys.exit(args.func(args))
+    interactive_main()
+
+def interactive_main():
+    """交互式菜单入口。"""
+    enable_colors()
+    if not list_accounts():
         print_header()
         print("未找到 Cloudflare 配置，让我们开始设置。")
         email = input("请输入您的 Cloudflare 邮箱地址: ").strip()
@@ -36,22 +580,15 @@ def main():
         if not success:
             sys.exit(1)
 
-    try:
-        cf_api = CloudflareAPI(email=email, api_key=api_key)
-    except ValueError as e:
-        handle_error(f"错误: {e}")
-        sys.exit(1)
-
-    print("正在获取域名列表，请稍候...")
-    zones, error = cf_api.get_zones()
-    if error:
-        handle_error(f"获取域名列表失败，无法继续操作: {error}")
-        sys.exit(1)
-    
-    domain_list = [zone["name"] for zone in zones]
+    # 切换过的账户保留各自的客户端、本地缓存和域名列表, 切回时无需重新获取
+    states = {}
+    session = open_account(states)
 
     while True:
-        print_header("可供选择的域名列表, q退出：")
+        state = states[session.name]
+        zones = state["data"]
+        domain_list = [zone["name"] for zone in zones]
+        print_header(f"当前账户: {Fore.CYAN}{session.name}{Style.RESET_ALL}\n可供选择的域名列表, e导出全部, a切换账户, q退出：")
         for i, domain in enumerate(domain_list, start=1):
             print(f"{Fore.GREEN}{i}{Style.RESET_ALL}. {Fore.BLUE}{domain}{Style.RESET_ALL}")
 
@@ -59,23 +596,124 @@ def main():
         if domain_choice.lower() == 'q':
             print("退出脚本")
             break
+        if domain_choice.lower() == 'e':
+            export_flow(session.api, zones)
+            continue
+        if domain_choice.lower() == 'a':
+            name = choose_account_flow(session.name)
+            if name and name != session.name:
+                set_current_account(name)
+                session = open_account(states, name)
+            continue
 
         try:
             domain_index = int(domain_choice) - 1
             domain_name = domain_list[domain_index]
             zone_id = zones[domain_index]["id"]
-            manage_domain_records(cf_api, domain_name, zone_id)
+            manage_domain_records(session.api, domain_name, zone_id, session.record_cache)
         except (ValueError, IndexError):
             continue
 
-def manage_domain_records(cf_api: CloudflareAPI, domain_name: str, zone_id: str):
-    """管理特定域名的 DNS 解析记录。"""
+def open_account(states: dict, name=None):
+    """打开账户的会话并准备其域名列表; 之前打开过的账户直接复用。"""
+    try:
+        session = ACCOUNTS.get(name)
+    except (KeyError, ValueError) as e:
+        handle_error(f"错误: {e}")
+        sys.exit(1)
+    if session.name in states:
+        return session
+
+    cf_api, cache = session.api, session.record_cache
+    state = {"data": cache.get_zones()}
+    if state["data"] is None:
+        print("正在获取域名列表，请稍候...")
+        zones, error = cf_api.get_zones()
+        if error:
+            handle_error(f"获取域名列表失败，无法继续操作: {error}")
+            sys.exit(1)
+        cache.save_zones(zones)
+        state["data"] = zones
+    else:
+        # 先使用缓存的域名列表, 后台更新后在下次显示菜单时生效
+        revalidate_in_background(state, lambda: fetch_zones(cf_api, cache))
+    states[session.name] = state
+    return session
+
+def choose_account_flow(current: str):
+    """选择要切换到的账户, 也可以添加新账户; 返回账户名称, 取消时返回 None。"""
+    names = list_accounts()
+    print("\n--- 切换账户 (n 添加账户, q 取消) ---")
+    for i, name in enumerate(names, start=1):
+        marker = f" {Fore.CYAN}(当前){Style.RESET_ALL}" if name == current else ""
+        print(f"{Fore.GREEN}{i}{Style.RESET_ALL}. {name}{marker}")
+    choice = input("请输入选项编号： ").strip()
+    if choice.lower() == 'n':
+        name = input("账户名称 (留空则使用邮箱): ").strip()
+        email = input("请输入您的 Cloudflare 邮箱地址: ").strip()
+        api_key = input("请输入您的 Cloudflare Global API Key: ").strip()
+        if not email or not api_key:
+            handle_error("邮箱和API Key均不能为空。")
+            return None
+        success, message = save_config(email, api_key, name or email, make_current=False)
+        if not success:
+            handle_error(message)
+            return None
+        return name or email
+    try:
+        return names[int(choice) - 1]
+    except (ValueError, IndexError):
+        return None
+
+def revalidate_in_background(state: dict, fetch):
+    """在后台重新获取数据, 期间 state['data'] 未被替换时用新数据更新。"""
+    stale = state["data"]
+    def worker():
+        fresh, error = fetch()
+        if not error and state["data"] is stale:
+            state["data"] = fresh
+    threading.Thread(target=worker, daemon=True).start()
+
+def fetch_zones(cf_api: CloudflareAPI, cache: RecordCache):
+    """获取域名列表并写入本地缓存。"""
+    zones, error = cf_api.get_zones()
+    if not error:
+        cache.save_zones(zones)
+    return zones, error
+
+def fetch_records(cf_api: CloudflareAPI, cache: RecordCache, zone_id: str):
+    """获取解析记录并与本地缓存比对, 只写入有变化的记录。"""
     records, error = cf_api.get_dns_records(zone_id)
-    if error:
-        handle_error(f"获取解析记录列表失败: {error}")
-        return
+    if not error:
+        cache.sync_records(zone_id, records)
+    return records, error
+
+def export_flow(cf_api: CloudflareAPI, zones: list):
+    """交互式导出全部域名的解析记录。"""
+    out_dir = input("导出目录 (默认当前目录, 'q' 取消): ").strip()
+    if out_dir.lower() == 'q': return
+    fmt = input("导出格式 (1: BIND, 2: NDJSON): ").strip()
+    fmt = "ndjson" if fmt == "2" else "bind"
+    results = export_zones(cf_api, zones, os.path.expanduser(out_dir or "."), fmt, on_done=report_export)
+    failed = sum(1 for _, error in results.values() if error)
+    print(f"{Fore.GREEN}导出完成, 成功 {len(results) - failed} 个域名, 失败 {failed} 个。")
+    input("按回车返回...")
+
+def manage_domain_records(cf_api: CloudflareAPI, domain_name: str, zone_id: str, cache: RecordCache):
+    """管理特定域名的 DNS 解析记录。"""
+    state = {"data": cache.get_records(zone_id)}
+    if state["data"] is None:
+        records, error = fetch_records(cf_api, cache, zone_id)
+        if error:
+            handle_error(f"获取解析记录列表失败: {error}")
+            return
+        state["data"] = records
+    else:
+        revalidate_in_background(state, lambda: fetch_records(cf_api, cache, zone_id))
 
+    index, query = RecordSearchIndex(), ""
     while True:
+        records = state["data"]
         title = f"您正在管理域名：{Fore.GREEN}{domain_name}{Style.RESET_ALL}"
         print_header(title)
         
@@ -83,21 +721,32 @@ def manage_domain_records(cf_api: CloudflareAPI, domain_name: str, zone_id: str)
         if not records:
             print(f"{Fore.YELLOW}此域名下未找到任何解析记录。")
         else:
+            index.sync(records)
+            matches = set(index.search(query)) if query else None
+            if matches is not None:
+                print(f"筛选条件: {Fore.CYAN}{query}{Style.RESET_ALL} (显示 {len(matches)}/{len(records)} 条, 输入 / 清除筛选)")
             for i, record in enumerate(records, start=1):
+                # 保留原始编号, 删除时仍按完整列表中的编号选择
+                if matches is not None and record['id'] not in matches:
+                    continue
                 proxy_status = f"({Fore.CYAN}代理开启{Style.RESET_ALL})" if record.get('proxied') else ""
                 print(f"[{i}] {Fore.GREEN}{record['name']}{Style.RESET_ALL} ({Fore.YELLOW}{record['type']}{Style.RESET_ALL}) -> {Fore.BLUE}{record['content']}{Style.RESET_ALL} {proxy_status}")
         
-        print("-----------------------\n1. 添加解析记录\n2. 删除解析记录\nq. 返回主域名列表\n-----------------------")
+        print("-----------------------\n1. 添加解析记录\n2. 删除解析记录\n3. 导入记录 (BIND/CSV)\n/关键词 筛选记录 (如 /www、/type:A proxied:yes)\nq. 返回主域名列表\n-----------------------")
         main_choice = input("请输入选项编号： ")
         
         action_taken = False
-        if main_choice == '1':
+        if main_choice.startswith('/'):
+            query = main_choice[1:].strip()
+        elif main_choice == '1':
             action_taken = add_record_flow(cf_api, domain_name, zone_id)
         elif main_choice == '2':
             if not records:
                 handle_error("当前没有可供删除的记录。")
                 continue
             action_taken = delete_record_flow(cf_api, zone_id, records)
+        elif main_choice == '3':
+            action_taken = import_records_flow(cf_api, domain_name, zone_id, records)
         elif main_choice.lower() == 'q':
             break
         else:
@@ -105,11 +754,11 @@ def manage_domain_records(cf_api: CloudflareAPI, domain_name: str, zone_id: str)
 
         if action_taken:
             print("操作完成，正在刷新记录列表...")
-            time.sleep(1)
-            records, error = cf_api.get_dns_records(zone_id)
+            records, error = fetch_records(cf_api, cache, zone_id)
             if error:
                 handle_error(f"刷新列表失败: {error}")
                 break
+            state["data"] = records
 
 def add_record_flow(cf_api: CloudflareAPI, domain_name: str, zone_id: str) -> bool:
     """引导用户添加一条新的 DNS 记录, 成功返回 True。"""
@@ -153,6 +802,37 @@ def add_record_flow(cf_api: CloudflareAPI, domain_name: str, zone_id: str) -> bo
     print(f"\n{Fore.GREEN}主机名解析成功！")
     return True
 
+def import_records_flow(cf_api: CloudflareAPI, domain_name: str, zone_id: str, records: list) -> bool:
+    """从 BIND 区域文件或 CSV 导入记录, 只提交差异部分, 有改动时返回 True。"""
+    print("\n--- 导入记录 (输入 'q' 取消) ---")
+    path = input("区域文件路径 (.csv 按 CSV 解析, 其余按 BIND 解析): ").strip()
+    if not path or path.lower() == 'q': return False
+    path = os.path.expanduser(path)
+    if not os.path.isfile(path):
+        handle_error("文件不存在。")
+        return False
+
+    prune_choice = input("是否删除文件中不存在的线上记录 (y: 删除, 其他为保留): ")
+    if prune_choice.lower() == 'q': return False
+
+    result, error = import_records(cf_api, {"id": zone_id, "name": domain_name}, path,
+                                   prune=(prune_choice.lower() == 'y'), live_records=records,
+                                   progress_callback=print_progress)
+    if result is None:
+        handle_error(f"导入失败: {error}")
+        return False
+    if not result['adds'] and not result['deletes']:
+        print(f"{Fore.GREEN}线上记录已与文件一致, 无需修改。")
+        pause()
+        return False
+
+    print()
+    print(f"{Fore.GREEN}导入完成: 计划新增 {len(result['adds'])} 条, 删除 {len(result['deletes'])} 条, "
+          f"成功 {len(result['succeeded'])} 项。")
+    print_failures(result, records)
+    pause()
+    return bool(result['succeeded'])
+
 def delete_record_flow(cf_api: CloudflareAPI, zone_id: str, records: list) -> bool:
     """引导用户删除 DNS 记录, 成功返回 True。"""
     print("\n--- 删除记录 ---")
@@ -165,10 +845,14 @@ def delete_record_flow(cf_api: CloudflareAPI, zone_id: str, records: list) -> bo
     action_success = False
     if user_input == "Delete all parsing records":
         print(f"{Fore.YELLOW}正在删除全部 {len(records)} 条解析记录...")
-        deleted_count = sum(1 for r in records if cf_api.delete_dns_record(zone_id, r['id'])[1] is None)
+        summary, _ = cf_api.bulk_delete_dns_records(zone_id, [r['id'] for r in records],
+                                                    progress_callback=print_progress)
+        print()
+        deleted_count = len(summary['succeeded'])
         if deleted_count > 0:
             action_success = True
         print(f"{Fore.GREEN}操作完成, 成功删除 {deleted_count} 条记录。")
+        print_failures(summary, records)
     else:
         try:
             record_index = int(user_input) - 1
@@ -177,13 +861,15 @@ def delete_record_flow(cf_api: CloudflareAPI, zone_id: str, records: list) -> bo
             _, err = cf_api.delete_dns_record(zone_id, record_to_delete['id'])
             if err:
                 handle_error(f"删除记录失败: {err}")
+                return False
             else:
                 print(f"{Fore.GREEN}记录已成功删除。")
                 action_success = True
         except (ValueError, IndexError):
             handle_error("无效的输入或编号。")
-    
-    time.sleep(1.5)
+            return False
+
+    pause()
     return action_success
 
 if __name__ == "__main__":
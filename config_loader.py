@@ -4,6 +4,8 @@ import json
 import base64
 import hashlib
 import getpass
+import tempfile
+import threading
 import uuid
 
 # 定义配置文件路径
@@ -29,9 +31,12 @@ class Encryptor:
         self.key = hashlib.sha256(secret_string.encode()).digest()
 
     def _xor_cipher(self, data: bytes) -> bytes:
-        """核心的XOR加密/解密逻辑"""
-        key_len = len(self.key)
-        return bytes([b ^ self.key[i % key_len] for i, b in enumerate(data)])
+        """核心的XOR加密/解密逻辑: 将数据和重复的密钥各视为一个大整数, 一次异或整个缓冲区"""
+        if not data:
+            return b""
+        length = len(data)
+        keystream = (self.key * (length // len(self.key) + 1))[:length]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(length, 'big')
 
     def encrypt(self, plaintext: str) -> str:
         """加密字符串并返回Base64编码的结果"""
@@ -49,48 +54,147 @@ class Encryptor:
         decoded_bytes = base64.b64decode(ciphertext.encode('utf-8'))
         return self._xor_cipher(decoded_bytes).decode('utf-8')
 
-# 创建一个全局的加密器实例
-_encryptor = Encryptor()
+# 全局的加密器实例, 首次读写配置时才创建 (uuid.getnode() 在某些环境下较慢)
+_encryptor = None
 
-def load_config():
+def _get_encryptor() -> Encryptor:
+    global _encryptor
+    if _encryptor is None:
+        _encryptor = Encryptor()
+    return _encryptor
 
-    if not os.path.exists(CONFIG_PATH):
-        return None, None
-    
+# 已解密配置的内存缓存, 只有文件的修改时间或大小变化时才重新读取和解密
+_config_cache = {"stamp": None, "value": None}
+_config_lock = threading.Lock()
+
+# 配置文件可保存多个账户:
+#   {"accounts": {名称: {"CF_Email_Encrypted": ..., "CF_Key_Encrypted": ...}}, "current": 名称,
+#    "CF_Email_Encrypted": ..., "CF_Key_Encrypted": ...}
+# 顶层的两个字段始终是当前账户, 与只支持单个账户的旧版本兼容; 旧版本的配置文件视为一个以邮箱命名的账户。
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _empty_store():
+    return {"accounts": {}, "current": None}
+
+def _load_store():
+    """返回 {"accounts": {名称: (email, api_key)}, "current": 名称}, 按文件修改时间缓存"""
+    stamp = _file_stamp(CONFIG_PATH)
+    if stamp is None:
+        return _empty_store()
+    with _config_lock:
+        if _config_cache["stamp"] == stamp:
+            return _config_cache["value"]
+    value = _read_store()
+    with _config_lock:
+        _config_cache["stamp"], _config_cache["value"] = stamp, value
+    return value
+
+def _decrypt_pair(entry, encryptor):
+    encrypted_email = entry.get("CF_Email_Encrypted")
+    encrypted_api_key = entry.get("CF_Key_Encrypted")
+    if not encrypted_email or not encrypted_api_key:
+        return None
+    return encryptor.decrypt(encrypted_email), encryptor.decrypt(encrypted_api_key)
+
+def _read_store():
     try:
         with open(CONFIG_PATH, 'r') as f:
             config_data = json.load(f)
-        
-        # 从文件中获取加密后的数据
-        encrypted_email = config_data.get("CF_Email_Encrypted")
-        encrypted_api_key = config_data.get("CF_Key_Encrypted")
-        
-        if not encrypted_email or not encrypted_api_key:
-            return None, None
-        
+
         # 解密数据
-        email = _encryptor.decrypt(encrypted_email)
-        api_key = _encryptor.decrypt(encrypted_api_key)
-            
-        return email, api_key
-    except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+        encryptor = _get_encryptor()
+        accounts = {}
+        for name, entry in (config_data.get("accounts") or {}).items():
+            pair = _decrypt_pair(entry, encryptor)
+            if pair:
+                accounts[name] = pair
+        current = config_data.get("current")
+        if not accounts:
+            # 旧版本的单账户配置
+            pair = _decrypt_pair(config_data, encryptor)
+            if pair:
+                current = pair[0]
+                accounts[current] = pair
+        if current not in accounts:
+            current = next(iter(accounts), None)
+        return {"accounts": accounts, "current": current}
+    except (OSError, json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError) as e:
         # 任何解析、解码、解密错误都视为配置无效
         print(f"配置文件加载或解密失败: {e}")
-        return None, None
+        return _empty_store()
+
+def _write_atomic(path, data):
+    """写入同目录下的临时文件后重命名, GUI 和 CLI 同时保存时读到的总是完整的文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _save_store(store):
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    # 在保存前加密数据
+    encryptor = _get_encryptor()
+    encrypted = {name: {"CF_Email_Encrypted": encryptor.encrypt(email), "CF_Key_Encrypted": encryptor.encrypt(key)}
+                 for name, (email, key) in store["accounts"].items()}
+    config_data = {"accounts": encrypted, "current": store["current"]}
+    if store["current"] in encrypted:
+        config_data.update(encrypted[store["current"]])
+    _write_atomic(CONFIG_PATH, config_data)
+    with _config_lock:
+        _config_cache["stamp"], _config_cache["value"] = _file_stamp(CONFIG_PATH), store
+
+def list_accounts():
+    """返回已保存的账户名称列表"""
+    return list(_load_store()["accounts"])
 
-def save_config(email: str, api_key: str):
+def current_account():
+    """返回当前账户名称, 没有任何账户时返回 None"""
+    return _load_store()["current"]
 
+def load_config(account=None):
+    """返回指定账户 (默认当前账户) 的 (email, api_key), 不存在时返回 (None, None)"""
+    store = _load_store()
+    return store["accounts"].get(account or store["current"], (None, None))
+
+def save_config(email: str, api_key: str, account=None, make_current=True):
+    """保存账户 (名称默认为邮箱), make_current 为 True 时同时设为当前账户"""
     try:
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-        
-        # 在保存前加密数据
-        config_data = {
-            "CF_Email_Encrypted": _encryptor.encrypt(email),
-            "CF_Key_Encrypted": _encryptor.encrypt(api_key)
-        }
-        
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(config_data, f, indent=4)
+        store = _load_store()
+        name = account or email
+        accounts = dict(store["accounts"], **{name: (email, api_key)})
+        current = name if make_current or not store["current"] else store["current"]
+        _save_store({"accounts": accounts, "current": current})
         return True, "配置已成功加密并保存！"
     except Exception as e:
-        return False, f"保存配置失败: {e}"
\ No newline at end of file
+        return False, f"保存配置失败: {e}"
+
+def set_current_account(account: str) -> bool:
+    """切换当前账户, 账户不存在时返回 False"""
+    store = _load_store()
+    if account not in store["accounts"]:
+        return False
+    if store["current"] != account:
+        _save_store({"accounts": store["accounts"], "current": account})
+    return True
+
+def remove_account(account: str) -> bool:
+    """删除账户, 删除的是当前账户时改用剩下的第一个账户"""
+    store = _load_store()
+    if account not in store["accounts"]:
+        return False
+    accounts = {name: pair for name, pair in store["accounts"].items() if name != account}
+    current = store["current"] if store["current"] != account else next(iter(accounts), None)
+    _save_store({"accounts": accounts, "current": current})
+    return True
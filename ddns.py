@@ -0,0 +1,227 @@
+# ddns.py
+import json
+import os
+import random
+import threading
+import time
+from config_loader import CONFIG_DIR
+from dns_sync import normalize_content
+from network.get_ip_api import SOURCES, get_public_ips
+from zone_files import normalize_name
+
+DDNS_CONFIG_PATH = os.path.join(CONFIG_DIR, 'ddns.json')
+
+RECORD_TYPES = {"v4": "A", "v6": "AAAA"}
+
+def target_name(name: str, zone: str) -> str:
+    """目标主机名可写 @、前缀或完整域名, 统一为完整域名"""
+    name = (name or "@").strip().rstrip(".").lower()
+    zone = zone.rstrip(".").lower()
+    if name == zone or name.endswith("." + zone):
+        return name
+    return normalize_name(name, zone)
+
+def load_ddns_config(path: str = DDNS_CONFIG_PATH):
+    """
+    读取 DDNS 配置, 返回 (targets, interval, sources)。格式:
+      {"interval": 300, "sources": ["local", "http"],
+       "targets": [{"zone": "example.com", "name": "home", "version": "v4", "proxied": false, "ttl": 1}]}
+    version 可为 v4、v6 或 both; sources 为地址来源顺序, 省略时使用默认顺序; 配置有误时抛出 ValueError。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    targets = []
+    for i, item in enumerate(config.get("targets", []), start=1):
+        if not item.get("zone"):
+            raise ValueError(f"第 {i} 个目标缺少 zone")
+        versions = ("v4", "v6") if item.get("version") == "both" else (item.get("version", "v4"),)
+        for version in versions:
+            if version not in RECORD_TYPES:
+                raise ValueError(f"第 {i} 个目标的 version 无效: {version}")
+            targets.append({
+                "zone": item["zone"].rstrip(".").lower(),
+                "name": target_name(item.get("name"), item["zone"]),
+                "type": RECORD_TYPES[version],
+                "version": version,
+                "proxied": bool(item.get("proxied", False)),
+                "ttl": int(item.get("ttl", 1)),
+            })
+    if not targets:
+        raise ValueError("配置中没有任何目标")
+    sources = config.get("sources")
+    unknown = [name for name in sources or () if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"未知的地址来源: {', '.join(unknown)}")
+    return targets, int(config.get("interval", DDNSUpdater.INTERVAL)), sources
+
+class DDNSUpdater:
+    """
+    动态 DNS 更新器: 每轮每个 IP 版本只查询一次公网地址, 与缓存的记录状态比较,
+    只有地址确实变化时才按域名批量提交修改, 数百个主机名共用一次查询和同一个 API 客户端。
+    检查间隔带随机抖动, 出错时按指数退避重试。
+    """
+    INTERVAL = 300          # 两次检查之间的间隔 (秒)
+    JITTER = 0.1            # 间隔的随机抖动比例, 避免多个实例同时请求
+    RETRY_DELAY = 30        # 出错后首次重试的等待时间 (秒), 此后每次翻倍
+    MAX_BACKOFF = 3600      # 退避等待的上限 (秒)
+    STATE_REFRESH = 12      # 每隔多少轮重新获取一次线上记录, 以发现在别处做的修改
+
+    def __init__(self, api, targets, interval=INTERVAL, cache=None, sources=None, ip_func=None,
+                 log=print, sleep=None, rand=random.random):
+        self.api = api
+        self.targets = list(targets)
+        self.interval = interval
+        self.cache = cache
+        # ip_func(versions) 返回 {version: (ip, error)}; 默认每轮都重新查询, 不使用进程内缓存
+        self._get_ips = ip_func or (lambda versions: get_public_ips(versions, use_cache=False, sources=sources))
+        self._log = log
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._random = rand
+        self._zone_ids = {}         # zone name -> zone id
+        self._state = {}            # (zone_id, name, type) -> [record]
+        self._stale_zones = set()
+        self._cycles = 0
+        self._failures = 0
+
+    def stop(self):
+        self._stop.set()
+
+    def _resolve_zones(self):
+        zones, error = self.api.get_zones()
+        if error:
+            return f"获取域名列表失败: {error}"
+        by_name = {zone['name'].lower(): zone['id'] for zone in zones}
+        missing = sorted({t['zone'] for t in self.targets} - by_name.keys())
+        if missing:
+            self._log(f"未找到域名, 已跳过: {', '.join(missing)}")
+        self._zone_ids = {name: zone_id for name, zone_id in by_name.items()
+                          if any(t['zone'] == name for t in self.targets)}
+        self._stale_zones = set(self._zone_ids.values())
+        return None
+
+    def _refresh_state(self, zone_id):
+        """获取该域名的全部记录作为比较基准, 每个域名一次分页查询"""
+        records, error = self.api.get_dns_records(zone_id)
+        if error:
+            return error
+        if self.cache:
+            self.cache.sync_records(zone_id, records)
+        for key in [key for key in self._state if key[0] == zone_id]:
+            del self._state[key]
+        for record in records:
+            if record['type'] in ("A", "AAAA"):
+                self._state.setdefault((zone_id, record['name'].lower(), record['type']), []).append(record)
+        self._stale_zones.discard(zone_id)
+        return None
+
+    def run_once(self):
+        """
+        执行一轮检查, 返回 (summary, error)。
+        summary 为 {"addresses": {version: ip}, "unchanged": n, "updated": [name], "created": [name], "failed": [(name, error)]}
+        """
+        summary = {"addresses": {}, "unchanged": 0, "updated": [], "created": [], "failed": []}
+        if not self._zone_ids:
+            error = self._resolve_zones()
+            if error:
+                return summary, error
+        self._cycles += 1
+        if self._cycles % self.STATE_REFRESH == 0:
+            self._stale_zones = set(self._zone_ids.values())
+
+        errors = []
+        for version, (ip, error) in self._get_ips(sorted({t['version'] for t in self.targets})).items():
+            if error:
+                errors.append(error)
+            else:
+                summary["addresses"][version] = ip
+
+        changes = {}    # zone_id -> {"patches": [...], "posts": [...]}
+        names = {}      # 修改的记录 id -> 主机名, 用于汇总
+        for target in self.targets:
+            zone_id = self._zone_ids.get(target['zone'])
+            ip = summary["addresses"].get(target['version'])
+            if zone_id is None or ip is None:
+                continue
+            if zone_id in self._stale_zones:
+                error = self._refresh_state(zone_id)
+                if error:
+                    errors.append(f"{target['zone']}: 获取解析记录失败: {error}")
+                    self._stale_zones.add(zone_id)
+                    continue
+            existing = self._state.get((zone_id, target['name'], target['type']), [])
+            # 同一主机有多条 A/AAAA 记录时, 每条都要指向新地址, 否则旧地址会继续被解析
+            stale = [record for record in existing
+                     if normalize_content(target['type'], record['content']) != normalize_content(target['type'], ip)]
+            if existing and not stale:
+                summary["unchanged"] += 1
+                continue
+            zone_changes = changes.setdefault(zone_id, {"patches": [], "posts": []})
+            if existing:
+                for record in stale:
+                    zone_changes["patches"].append({"id": record['id'], "content": ip})
+                    names[record['id']] = target['name']
+            else:
+                zone_changes["posts"].append({"type": target['type'], "name": target['name'], "content": ip,
+                                              "ttl": target['ttl'], "proxied": target['proxied']})
+
+        for zone_id, zone_changes in changes.items():
+            result, error = self.api.bulk_mutate(zone_id, patches=zone_changes["patches"], posts=zone_changes["posts"])
+            for action, item, record in result["succeeded"]:
+                if isinstance(record, dict) and record.get('id'):
+                    self._remember(zone_id, record)
+                name = (names.get(item.get('id')) or item.get('name')
+                        or (record.get('name') if isinstance(record, dict) else None) or item.get('id'))
+                reported = summary["updated" if action == "patch" else "created"]
+                if name not in reported:    # 多条记录的主机只汇总一次
+                    reported.append(name)
+            for action, item, err in result["failed"]:
+                summary["failed"].append((names.get(item.get('id')) or item.get('name') or item.get('id'), err))
+            if result["failed"]:
+                # 失败可能是因为记录已在别处被修改, 下一轮重新获取
+                self._stale_zones.add(zone_id)
+            if error:
+                errors.append(error)
+
+        if summary["failed"] and not errors:
+            errors.append(f"{len(summary['failed'])} 条记录更新失败")
+        return summary, "; ".join(errors) or None
+
+    def _remember(self, zone_id, record):
+        key = (zone_id, record['name'].lower(), record['type'])
+        records = [r for r in self._state.get(key, []) if r['id'] != record['id']]
+        self._state[key] = [record] + records
+
+    def next_delay(self, failed: bool) -> float:
+        """下一轮检查前的等待时间: 正常按间隔, 出错时指数退避, 均带随机抖动"""
+        if failed:
+            self._failures += 1
+            delay = min(self.RETRY_DELAY * 2 ** (self._failures - 1), self.MAX_BACKOFF)
+        else:
+            self._failures = 0
+            delay = self.interval
+        return delay * (1 + self.JITTER * (2 * self._random() - 1))
+
+    def run(self, once=False):
+        """持续运行直到 stop() 被调用; once 为 True 时只执行一轮。返回最后一轮是否成功"""
+        while True:
+            summary, error = self.run_once()
+            self._report(summary, error)
+            if once or self._stop.is_set():
+                return error is None
+            if self._sleep(self.next_delay(error is not None)) or self._stop.is_set():
+                return error is None
+
+    def _report(self, summary, error):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        addresses = ", ".join(f"{v}={ip}" for v, ip in sorted(summary["addresses"].items())) or "无"
+        self._log(f"[{stamp}] 公网地址: {addresses}; 未变化 {summary['unchanged']}, "
+                  f"更新 {len(summary['updated'])}, 新建 {len(summary['created'])}, 失败 {len(summary['failed'])}")
+        for name in summary["updated"]:
+            self._log(f"  已更新 {name}")
+        for name in summary["created"]:
+            self._log(f"  已新建 {name}")
+        for name, err in summary["failed"]:
+            self._log(f"  {name}: {err}")
+        if error:
+            self._log(f"  错误: {error}")
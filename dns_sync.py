@@ -0,0 +1,212 @@
+# dns_sync.py
+import ipaddress
+from zone_files import HOSTNAME_TYPES, iter_records_file
+
+def normalize_content(record_type: str, content: str) -> str:
+    """统一记录内容的写法, 使文件中的记录和 API 返回的记录可以直接比较"""
+    content = (content or "").strip()
+    if record_type in HOSTNAME_TYPES:
+        return content.rstrip(".").lower()
+    if record_type == "TXT":
+        # Cloudflare 可能返回带引号的 TXT 内容
+        if len(content) >= 2 and content[0] == content[-1] == '"':
+            content = content[1:-1].replace('" "', "")
+        return content
+    if record_type in ("A", "AAAA"):
+        try:
+            return str(ipaddress.ip_address(content))
+        except ValueError:
+            return content
+    return content
+
+def record_key(record: dict):
+    """记录的比较键 (type, name, content)"""
+    record_type = record["type"].upper()
+    return record_type, record["name"].rstrip(".").lower(), normalize_content(record_type, record.get("content"))
+
+def to_payload(record: dict) -> dict:
+    """取出创建记录时需要提交的字段"""
+    payload = {k: record[k] for k in ("type", "name", "content", "ttl", "proxied") if k in record}
+    if record.get("priority") is not None:
+        payload["priority"] = record["priority"]
+    return payload
+
+def diff_records(live_records, desired_records, prune=False):
+    """
+    以 (type, name, content) 哈希索引比较线上记录和目标记录, 返回 (adds, deletes)。
+    desired_records 可以是生成器, 只遍历一次; prune 为 False 时不删除任何线上记录。
+    """
+    live_index = {}
+    for record in live_records:
+        live_index.setdefault(record_key(record), []).append(record)
+
+    adds, seen = [], set()
+    for record in desired_records:
+        key = record_key(record)
+        if key in seen:
+            continue
+        seen.add(key)
+        if key not in live_index:
+            adds.append(record)
+
+    deletes = []
+    if prune:
+        for key, records in live_index.items():
+            if key not in seen:
+                deletes.extend(records)
+    return adds, deletes
+
+def is_managed_by_cloudflare(record: dict, zone_name: str) -> bool:
+    """根域名的 NS 记录由 Cloudflare 管理, 不参与导入和同步"""
+    return record['type'] == 'NS' and record['name'].rstrip('.').lower() == zone_name
+
+def desired_records_from_file(path: str, zone_name: str):
+    """逐条产出文件中需要同步的记录"""
+    zone_name = zone_name.lower()
+    return (r for r in iter_records_file(path, zone_name) if not is_managed_by_cloudflare(r, zone_name))
+
+def import_records(api, zone: dict, path: str, prune=False, live_records=None, progress_callback=None):
+    """
+    将 BIND 区域文件或 CSV 导入区域, 只提交实际需要的新增和删除。
+    live_records 为已获取的线上记录, 为空时调用 get_dns_records 获取。
+    返回 ({"adds": [...], "deletes": [...], "succeeded": [...], "failed": [...]}, error)。
+    """
+    if live_records is None:
+        live_records, error = api.get_dns_records(zone['id'])
+        if error:
+            return None, error
+
+    zone_name = zone['name'].lower()
+    live_records = [r for r in live_records if not is_managed_by_cloudflare(r, zone_name)]
+    desired = desired_records_from_file(path, zone_name)
+    try:
+        adds, deletes = diff_records(live_records, desired, prune=prune)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return None, f"读取导入文件失败: {e}"
+
+    result = {"adds": adds, "deletes": deletes, "succeeded": [], "failed": []}
+    if not adds and not deletes:
+        return result, None
+
+    summary, error = api.bulk_mutate(zone['id'],
+                                     deletes=[{"id": r['id']} for r in deletes],
+                                     posts=[to_payload(r) for r in adds],
+                                     progress_callback=progress_callback)
+    result.update(summary)
+    return result, error
+
+# 除 content 外, 同步时需要比较的字段
+SYNC_FIELDS = ("ttl", "proxied", "priority")
+
+def _changed_fields(live: dict, desired: dict) -> dict:
+    """返回 desired 中与 live 不同的字段"""
+    changes = {}
+    for field in SYNC_FIELDS:
+        if field in desired and desired[field] is not None and live.get(field) != desired[field]:
+            changes[field] = desired[field]
+    return changes
+
+def plan_changes(live_records, desired_records, zone_name: str = ""):
+    """
+    计算使线上记录与目标状态一致所需的最少操作, 全程使用哈希索引, 时间复杂度为线性。
+    先按 (type, name, content) 精确匹配, 只需调整 TTL/代理等字段的记为 update;
+    剩余记录按 (type, name) 配对, 内容变化的记为 update, 多出的分别记为 create / delete。
+    返回 {"create": [desired], "update": [(live, changes)], "delete": [live]}。
+    """
+    zone_name = zone_name.lower()
+    live_by_key = {}
+    for record in live_records:
+        if not is_managed_by_cloudflare(record, zone_name):
+            live_by_key.setdefault(record_key(record), []).append(record)
+
+    plan = {"create": [], "update": [], "delete": []}
+    unmatched_desired, seen = {}, set()
+    for record in desired_records:
+        key = record_key(record)
+        if key in seen:
+            continue
+        seen.add(key)
+        bucket = live_by_key.get(key)
+        if bucket:
+            live = bucket.pop()
+            changes = _changed_fields(live, record)
+            if changes:
+                plan["update"].append((live, changes))
+        else:
+            unmatched_desired.setdefault(key[:2], []).append(record)
+
+    # 同一 (type, name) 下未匹配的线上记录, 优先改写内容而不是删除后重建
+    unmatched_live = {}
+    for key, bucket in live_by_key.items():
+        for live in bucket:
+            unmatched_live.setdefault(key[:2], []).append(live)
+
+    for type_name, desired_list in unmatched_desired.items():
+        live_list = unmatched_live.pop(type_name, [])
+        for live, desired in zip(live_list, desired_list):
+            changes = _changed_fields(live, desired)
+            changes["content"] = desired["content"]
+            plan["update"].append((live, changes))
+        plan["create"].extend(desired_list[len(live_list):])
+        plan["delete"].extend(live_list[len(desired_list):])
+    for live_list in unmatched_live.values():
+        plan["delete"].extend(live_list)
+    return plan
+
+def plan_is_empty(plan: dict) -> bool:
+    return not (plan["create"] or plan["update"] or plan["delete"])
+
+def format_plan(plan: dict):
+    """逐行产出便于阅读的计划 (+ 新增, ~ 修改, - 删除)"""
+    for record in plan["create"]:
+        yield f"+ {record['type']:<6} {record['name']} -> {record['content']}"
+    for live, changes in plan["update"]:
+        detail = ", ".join(f"{k}: {live.get(k)} => {v}" for k, v in changes.items())
+        yield f"~ {live['type']:<6} {live['name']} ({detail})"
+    for record in plan["delete"]:
+        yield f"- {record['type']:<6} {record['name']} -> {record['content']}"
+
+def apply_plan(api, zone_id: str, plan: dict, progress_callback=None):
+    """通过批量接口执行计划, 返回 bulk_mutate 的 (summary, error)"""
+    return api.bulk_mutate(zone_id,
+                           deletes=[{"id": r['id']} for r in plan["delete"]],
+                           patches=[dict(changes, id=live['id']) for live, changes in plan["update"]],
+                           posts=[to_payload(r) for r in plan["create"]],
+                           progress_callback=progress_callback)
+
+def replace_content(api, matches, new_content: str, progress_callback=None):
+    """
+    将反查得到的记录 [(zone_id, record)] 的内容批量改为 new_content, 按域名分组通过批量接口修改。
+    A/AAAA 记录要求 new_content 是对应版本的 IP 地址, 不符合的记录直接记为失败。
+    返回 ({zone_id: summary}, error), summary 格式同 bulk_mutate。
+    """
+    try:
+        version = ipaddress.ip_address(new_content.strip()).version
+    except ValueError:
+        version = None
+    expected = {"A": 4, "AAAA": 6}
+
+    by_zone = {}
+    for zone_id, record in matches:
+        by_zone.setdefault(zone_id, []).append(record)
+
+    total, done = len(matches), 0
+    results, failed = {}, 0
+    for zone_id, records in by_zone.items():
+        patches, rejected = [], []
+        for record in records:
+            if record["type"] in expected and expected[record["type"]] != version:
+                rejected.append(("patch", {"id": record["id"]}, f"{new_content} 不是有效的 {record['type']} 记录内容"))
+            else:
+                patches.append({"id": record["id"], "content": new_content.strip()})
+
+        offset = done
+        callback = (lambda d, t, offset=offset: progress_callback(offset + d, total)) if progress_callback else None
+        summary, _ = api.bulk_mutate(zone_id, patches=patches, progress_callback=callback)
+        summary["failed"].extend(rejected)
+        done += len(records)
+        if progress_callback and rejected:
+            progress_callback(done, total)
+        failed += len(summary["failed"])
+        results[zone_id] = summary
+    return results, (f"{failed} 项操作失败" if failed else None)
@@ -6,14 +6,18 @@ import sys
 def main():
     parser = argparse.ArgumentParser(description="Cloudflare DNS Manager")
     parser.add_argument("--cli", action="store_true",
-                        help="Run in CLI mode")
-    args = parser.parse_args()
+                        help="Run in CLI mode, remaining arguments are passed to cli-manager.py")
+    args, cli_args = parser.parse_known_args()
 
     if args.cli:
-        import subprocess
+        # 在当前进程中运行 CLI, 省去再启动一个解释器的开销
+        import runpy
         script_dir = os.path.dirname(os.path.abspath(__file__))
         cli_script = os.path.join(script_dir, "cli-manager.py")
-        sys.exit(subprocess.call([sys.executable, cli_script]))
+        sys.argv = [cli_script] + cli_args
+        runpy.run_path(cli_script, run_name="__main__")
+    elif cli_args:
+        parser.error(f"unrecognized arguments: {' '.join(cli_args)}")
     else:
         import gi
         gi.require_version('Gtk', '4.0')
@@ -0,0 +1,150 @@
+# async_cloudflare_api.py
+import asyncio
+import aiohttp
+from network.rate_limit import INTERACTIVE, default_scheduler
+
+class AsyncCloudflareAPI:
+    """
+    基于 asyncio 的 Cloudflare 客户端, 接口与 CloudflareAPI 一致, 返回 (result, error)。
+    所有请求共享一个 aiohttp 会话, 并由信号量限制同时进行的请求数。
+
+        async with AsyncCloudflareAPI(email, key) as api:
+            zones, error = await api.get_zones()
+    """
+    BASE_URL = "https://api.cloudflare.com/client/v4"
+    ZONES_PER_PAGE = 50
+    RECORDS_PER_PAGE = 1000
+    MAX_CONCURRENCY = 20          # 同时进行的最大请求数
+    POOL_SIZE = 20                # 连接池上限
+    TIMEOUT = (5, 30)             # (连接超时, 读取超时) 秒
+
+    def __init__(self, email: str, api_key: str, max_concurrency: int = MAX_CONCURRENCY,
+                 pool_size: int = POOL_SIZE, timeout=TIMEOUT, scheduler=None, priority=INTERACTIVE):
+        if not email or not api_key:
+            raise ValueError("API Key 和 Email 不能为空")
+        # 与同步客户端共用进程内的调度器; 协程之间没有线程上下文, 优先级按客户端设置
+        self.scheduler = scheduler or default_scheduler()
+        self.account_key = email
+        self.priority = priority
+
+        self.headers = {
+            "X-Auth-Email": email,
+            "X-Auth-Key": api_key,
+            "Content-Type": "application/json"
+        }
+        self.max_concurrency = max(1, max_concurrency)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _ensure_session(self):
+        # 会话和信号量需在事件循环内创建
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """关闭会话及其连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _acquire(self):
+        """等待该账户的令牌; 令牌不足时 await asyncio.sleep, 不占用线程"""
+        loop = asyncio.get_running_loop()
+        start, waited = loop.time(), 0.0
+        while True:
+            delay = self.scheduler.try_acquire(self.account_key, self.priority, waited)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+            waited = loop.time() - start
+
+    async def _request(self, method, endpoint, **kwargs):
+        """通用请求处理"""
+        session = await self._ensure_session()
+        url = f"{self.BASE_URL}/{endpoint}"
+        attempt = 0
+        try:
+            async with self._semaphore:
+                while True:
+                    await self._acquire()
+                    async with session.request(method.upper(), url, **kwargs) as response:
+                        delay = self.scheduler.retry_delay(self.account_key, method, response.status,
+                                                           response.headers.get("Retry-After"), attempt)
+                        if delay is None:
+                            try:
+                                data = await response.json(content_type=None)
+                            except ValueError:
+                                data = None
+                            if response.status >= 400:
+                                try:
+                                    error_detail = data['errors'][0]['message']
+                                except (KeyError, IndexError, TypeError):
+                                    error_detail = f"{response.status} {response.reason}"
+                                return None, f"API 请求失败: {error_detail}"
+                            return data, None
+                    attempt += 1
+                    if response.status != 429:  # 429 已暂停整个账户, 下一次 acquire 会等到暂停结束
+                        await asyncio.sleep(delay)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return None, f"API 请求失败: {str(e) or type(e).__name__}"
+
+    async def _get_page(self, endpoint, page, per_page, params=None):
+        """获取分页接口的某一页, 返回 (data, error)"""
+        query = dict(params or {}, page=page, per_page=per_page)
+        return await self._request("get", endpoint, params=query)
+
+    async def _get_all_pages(self, endpoint, per_page, params=None):
+        """先取第一页读出总页数, 其余页并发获取 (受信号量限制)"""
+        data, error = await self._get_page(endpoint, 1, per_page, params)
+        if error:
+            return None, error
+        results = list(data['result'])
+
+        total_pages = (data.get('result_info') or {}).get('total_pages') or 1
+        if total_pages > 1:
+            pages = await asyncio.gather(*(
+                self._get_page(endpoint, page, per_page, params) for page in range(2, total_pages + 1)
+            ))
+            for page_data, error in pages:
+                if error:
+                    return None, error
+                results.extend(page_data['result'])
+        return results, None
+
+    async def get_zones(self):
+        """获取所有可用域名区域"""
+        return await self._get_all_pages("zones", self.ZONES_PER_PAGE)
+
+    async def get_dns_records(self, zone_id: str):
+        """获取指定区域的全部 DNS 记录"""
+        return await self._get_all_pages(f"zones/{zone_id}/dns_records", self.RECORDS_PER_PAGE)
+
+    async def add_dns_record(self, zone_id: str, record_type: str, name: str, content: str, proxied: bool = False, ttl: int = 1):
+        """添加一条 DNS 记录"""
+        payload = {
+            "type": record_type,
+            "name": name,
+            "content": content,
+            "ttl": ttl,
+            "proxied": proxied
+        }
+        return await self._request("post", f"zones/{zone_id}/dns_records", json=payload)
+
+    async def delete_dns_record(self, zone_id: str, record_id: str):
+        """删除一条 DNS 记录"""
+        return await self._request("delete", f"zones/{zone_id}/dns_records/{record_id}")
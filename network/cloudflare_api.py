@@ -1,24 +1,76 @@
 # cloudflare_api.py
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from network.rate_limit import default_scheduler, inherit_priority
 
 class CloudflareAPI:
     BASE_URL = "https://api.cloudflare.com/client/v4"
+    ZONES_PER_PAGE = 50           # zones 接口单页上限
+    RECORDS_PER_PAGE = 1000       # dns_records 单页条数
+    MAX_PAGE_WORKERS = 4          # 并发拉取分页的最大请求数
+    POOL_SIZE = 10                # 连接池中保持的长连接数
+    TIMEOUT = (5, 30)             # (连接超时, 读取超时) 秒
+    BATCH_SIZE = 200              # 批量接口单次请求包含的最大操作数
+    MAX_MUTATION_WORKERS = 8      # 批量修改时并发请求数上限
 
-    def __init__(self, email: str, api_key: str):
+    def __init__(self, email: str, api_key: str, max_page_workers: int = MAX_PAGE_WORKERS,
+                 pool_size: int = POOL_SIZE, timeout=TIMEOUT, scheduler=None):
         if not email or not api_key:
             raise ValueError("API Key 和 Email 不能为空")
+        # 同一账户的所有客户端共用一个令牌桶, 配额按账户计算
+        self.scheduler = scheduler or default_scheduler()
+        self.account_key = email
             
         self.headers = {
             "X-Auth-Email": email,
             "X-Auth-Key": api_key,
             "Content-Type": "application/json"
         }
+        self.max_page_workers = max(1, max_page_workers)
+        self.timeout = timeout
+
+        # requests 在创建客户端时才导入, 不需要访问 API 的路径 (如 --help) 不必加载
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        # 复用同一个会话, 保持 keep-alive 长连接, 避免每次请求重新握手 TCP+TLS
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # ACCEPT_ENCODING 只包含当前环境能解码的压缩格式 (安装 brotli 时包含 br)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, self.max_page_workers))
+        self.session.mount("https://", self._adapter)
+
+    def close(self):
+        """关闭会话及其连接池"""
+        self.session.close()
+
+    def rate_limit_stats(self):
+        """返回调度器统计: 请求数, 因限速等待的次数 (throttled), 收到 429 的次数, 重试次数"""
+        return self.scheduler.stats()
+
+    def pool_stats(self):
+        """返回连接池统计: 总请求数, 新建连接数, 复用连接数"""
+        total, created = 0, 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            total += pool.num_requests
+            created += pool.num_connections
+        return {"requests": total, "new_connections": created, "reused_connections": total - created}
 
     def _request(self, method, endpoint, **kwargs):
         """通用请求处理"""
+        import requests
         try:
             url = f"{self.BASE_URL}/{endpoint}"
-            response = requests.request(method, url, headers=self.headers, **kwargs)
+            kwargs.setdefault("timeout", self.timeout)
+            # 由调度器限速, 429/5xx 时按 Retry-After 或退避自动重试
+            response = self.scheduler.execute(
+                self.account_key, method, lambda: self.session.request(method, url, **kwargs),
+                retry_exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout))
             response.raise_for_status() # 如果状态码不是 2xx，则抛出异常
             return response.json(), None
         except requests.exceptions.RequestException as e:
@@ -29,15 +81,72 @@ class CloudflareAPI:
                 error_detail = str(e)
             return None, f"API 请求失败: {error_detail}"
 
+    def _get_page(self, endpoint, page, per_page, params=None):
+        """获取分页接口的某一页, 返回 (data, error)"""
+        query = dict(params or {}, page=page, per_page=per_page)
+        return self._request("get", endpoint, params=query)
+
+    def _iter_pages(self, endpoint, per_page, params=None):
+        """
+        逐页产出 (result, error)。
+        先取第一页读出 result_info.total_pages, 其余页并发获取, 但最多只提前
+        max_page_workers 页, 保证按页序产出且内存占用不随区域大小增长。
+        出错时产出 (None, error) 后结束。
+        """
+        data, error = self._get_page(endpoint, 1, per_page, params)
+        if error:
+            yield None, error
+            return
+        yield data['result'], None
+
+        total_pages = (data.get('result_info') or {}).get('total_pages') or 1
+        if total_pages <= 1:
+            return
+
+        pages = iter(range(2, total_pages + 1))
+        get_page = inherit_priority(self._get_page)  # 分页线程沿用调用方的请求优先级
+        with ThreadPoolExecutor(max_workers=self.max_page_workers) as executor:
+            pending = []
+            for page in pages:
+                pending.append(executor.submit(get_page, endpoint, page, per_page, params))
+                if len(pending) >= self.max_page_workers:
+                    break
+            while pending:
+                data, error = pending.pop(0).result()
+                if error:
+                    for future in pending:
+                        future.cancel()
+                    yield None, error
+                    return
+                next_page = next(pages, None)
+                if next_page is not None:
+                    pending.append(executor.submit(get_page, endpoint, next_page, per_page, params))
+                yield data['result'], None
+
+    def _get_all_pages(self, endpoint, per_page, params=None):
+        """获取分页接口的全部结果, 返回 (list, error)"""
+        results = []
+        for page_result, error in self._iter_pages(endpoint, per_page, params):
+            if error:
+                return None, error
+            results.extend(page_result)
+        return results, None
+
+    def iter_zones(self):
+        """逐页产出 (zones, error), 第一页到达即可开始处理"""
+        return self._iter_pages("zones", self.ZONES_PER_PAGE)
+
     def get_zones(self):
         """获取所有可用域名区域"""
-        data, error = self._request("get", "zones")
-        return (data['result'], error) if data else (None, error)
+        return self._get_all_pages("zones", self.ZONES_PER_PAGE)
+
+    def iter_dns_records(self, zone_id: str):
+        """逐页产出 (records, error), 第一页到达即可开始处理"""
+        return self._iter_pages(f"zones/{zone_id}/dns_records", self.RECORDS_PER_PAGE)
 
     def get_dns_records(self, zone_id: str):
-        """获取指定区域的 DNS 记录"""
-        data, error = self._request("get", f"zones/{zone_id}/dns_records")
-        return (data['result'], error) if data else (None, error)
+        """获取指定区域的全部 DNS 记录"""
+        return self._get_all_pages(f"zones/{zone_id}/dns_records", self.RECORDS_PER_PAGE)
 
     def add_dns_record(self, zone_id: str, record_type: str, name: str, content: str, proxied: bool = False, ttl: int = 1):
         """添加一条 DNS 记录"""
@@ -51,8 +160,103 @@ class CloudflareAPI:
         data, error = self._request("post", f"zones/{zone_id}/dns_records", json=payload)
         return (data, error)
 
+    def update_dns_record(self, zone_id: str, record_id: str, **fields):
+        """就地修改一条 DNS 记录 (PATCH), 只提交给出的字段; 返回 (修改后的记录, error)"""
+        data, error = self._request("patch", f"zones/{zone_id}/dns_records/{record_id}", json=fields)
+        return (data['result'], error) if data else (None, error)
+
     def delete_dns_record(self, zone_id: str, record_id: str):
         """删除一条 DNS 记录"""
         return self._request("delete", f"zones/{zone_id}/dns_records/{record_id}")
-        
-    
\ No newline at end of file
+
+    def batch_dns_records(self, zone_id: str, deletes=(), patches=(), posts=()):
+        """
+        调用批量接口在一次请求中原子地执行多项修改。
+        deletes 为 {"id": ...}, patches 为 {"id": ..., 字段...}, posts 为新记录内容。
+        成功时返回 {"deletes": [...], "patches": [...], "posts": [...]}。
+        """
+        payload = {}
+        for key, items in (("deletes", deletes), ("patches", patches), ("posts", posts)):
+            if items:
+                payload[key] = list(items)
+        data, error = self._request("post", f"zones/{zone_id}/dns_records/batch", json=payload)
+        return (data['result'], error) if data else (None, error)
+
+    def _apply_single(self, zone_id: str, action: str, item: dict):
+        """批量接口不可用时, 逐条执行单个修改"""
+        endpoint = f"zones/{zone_id}/dns_records"
+        if action == "delete":
+            data, error = self._request("delete", f"{endpoint}/{item['id']}")
+        elif action == "patch":
+            body = {k: v for k, v in item.items() if k != 'id'}
+            data, error = self._request("patch", f"{endpoint}/{item['id']}", json=body)
+        else:
+            data, error = self._request("post", endpoint, json=item)
+        return (data['result'], error) if data else (None, error)
+
+    def _apply_batch(self, zone_id: str, action: str, items: list):
+        """以一次批量请求执行同类修改, 返回与 items 一一对应的结果"""
+        key = action + "s"
+        result, error = self.batch_dns_records(zone_id, **{key: items})
+        if error:
+            return None, error
+        returned = result.get(key) or []
+        return [returned[i] if i < len(returned) else item for i, item in enumerate(items)], None
+
+    def bulk_mutate(self, zone_id: str, deletes=(), patches=(), posts=(), progress_callback=None, use_batch=True):
+        """
+        批量修改 DNS 记录, 返回 (summary, error)。
+        优先使用批量接口, 每 BATCH_SIZE 项一个请求; 批量请求失败时该批退回为逐条并发修改,
+        以便得到每条记录各自的结果。按 删除 -> 修改 -> 新增 的顺序分阶段执行,
+        同一阶段内最多 MAX_MUTATION_WORKERS 个请求并发。
+        summary 为 {"succeeded": [(action, item, result)], "failed": [(action, item, error)]},
+        progress_callback(done, total) 在每完成一项后调用。
+        """
+        summary = {"succeeded": [], "failed": []}
+        phases = [("delete", list(deletes)), ("patch", list(patches)), ("post", list(posts))]
+        total = sum(len(items) for _, items in phases)
+        done = 0
+        apply_batch, apply_single = inherit_priority(self._apply_batch), inherit_priority(self._apply_single)
+
+        with ThreadPoolExecutor(max_workers=self.MAX_MUTATION_WORKERS) as executor:
+            for action, items in phases:
+                if not items:
+                    continue
+                pending = {}
+                if use_batch:
+                    for start in range(0, len(items), self.BATCH_SIZE):
+                        chunk = items[start:start + self.BATCH_SIZE]
+                        pending[executor.submit(apply_batch, zone_id, action, chunk)] = ("batch", chunk)
+                else:
+                    for item in items:
+                        pending[executor.submit(apply_single, zone_id, action, item)] = ("single", item)
+
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        kind, payload = pending.pop(future)
+                        result, error = future.result()
+                        if kind == "batch":
+                            if error:
+                                # 批量请求失败 (接口不可用或其中某条无效), 退回逐条执行
+                                for item in payload:
+                                    pending[executor.submit(apply_single, zone_id, action, item)] = ("single", item)
+                                continue
+                            summary["succeeded"].extend((action, item, res) for item, res in zip(payload, result))
+                            done += len(payload)
+                        else:
+                            if error:
+                                summary["failed"].append((action, payload, error))
+                            else:
+                                summary["succeeded"].append((action, payload, result))
+                            done += 1
+                        if progress_callback:
+                            progress_callback(done, total)
+
+        failed = len(summary["failed"])
+        return summary, (f"{failed} 项操作失败" if failed else None)
+
+    def bulk_delete_dns_records(self, zone_id: str, record_ids, progress_callback=None):
+        """批量删除 DNS 记录, 返回 (summary, error)"""
+        return self.bulk_mutate(zone_id, deletes=[{"id": rid} for rid in record_ids],
+                                progress_callback=progress_callback)
@@ -1,39 +1,191 @@
 # utils.py
-import requests
-
-def get_public_ip(version='v4'):
-    """获取本机的公网 IP 地址，支持v4和v6，并增加备用API。"""
-    
-    # 定义一组API端点，每个都包含v4和v6的URL，并指定其返回类型
-    api_endpoints = [
-        {'name': 'ping0.cc', 'v4': 'https://ipv4.ping0.cc', 'v6': 'https://ipv6.ping0.cc', 'type': 'text'},
-        {'name': 'ipinfo.io', 'v4': 'https://ipinfo.io/json', 'v6': 'https://v6.ipinfo.io/json', 'type': 'json'},
-        {'name': 'ipify.org', 'v4': 'https://api.ipify.org?format=json', 'v6': 'https://api64.ipify.org?format=json', 'type': 'json'}
-    ]
-
-    for api in api_endpoints:
-        url = api.get(version)
-        if not url:
-            continue
+import ipaddress
+import queue
+import socket
+import threading
+import time
 
+# 定义一组API端点，每个都包含v4和v6的URL，并指定其返回类型
+API_ENDPOINTS = [
+    {'name': 'ping0.cc', 'v4': 'https://ipv4.ping0.cc', 'v6': 'https://ipv6.ping0.cc', 'type': 'text'},
+    {'name': 'ipinfo.io', 'v4': 'https://ipinfo.io/json', 'v6': 'https://v6.ipinfo.io/json', 'type': 'json'},
+    {'name': 'ipify.org', 'v4': 'https://api.ipify.org?format=json', 'v6': 'https://api64.ipify.org?format=json', 'type': 'json'}
+]
+
+TIMEOUT = 5         # 单个端点的超时时间 (秒), 也是整次查询的最长等待时间
+CACHE_TTL = 60      # 查询结果在内存中的缓存时间 (秒)
+
+# 默认的地址来源顺序: 先读取本机网卡上的公网地址, 没有时再通过 HTTP 查询
+ADDRESS_SOURCES = ("local", "http")
+
+IF_INET6_PATH = "/proc/net/if_inet6"
+FIB_TRIE_PATH = "/proc/net/fib_trie"
+# /proc/net/if_inet6 中的地址标志: 临时地址, 以及不应使用的 (DAD 失败/已弃用/待定) 地址
+IFA_F_TEMPORARY = 0x01
+IFA_F_UNUSABLE = 0x08 | 0x20 | 0x40
+
+_cache = {}         # (version, sources) -> (ip, 过期时间)
+_cache_lock = threading.Lock()
+
+def _parse_ip(text: str, version: str):
+    """校验端点返回的地址, 只接受与所查询版本一致的 IP"""
+    # 如果是 httpbin.org (或其他可能返回多个IP的)，取第一个
+    candidate = (text or "").split(',')[0].strip()
+    try:
+        ip = ipaddress.ip_address(candidate)
+    except ValueError:
+        return None
+    return str(ip) if ip.version == (6 if version == 'v6' else 4) else None
+
+def _query_endpoint(api: dict, version: str, timeout: float):
+    url = api.get(version)
+    if not url:
+        return None
+    import requests  # 只有 HTTP 来源需要, 本机来源不必加载
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        if api['type'] == 'text':
+            return _parse_ip(response.text, version)
+        data = response.json()
+        return _parse_ip(data.get('ip') or data.get('origin'), version)
+    except (requests.RequestException, ValueError, AttributeError):
+        return None
+
+def _global(ip: str, version: str):
+    address = ipaddress.ip_address(ip)
+    return address.version == (6 if version == 'v6' else 4) and address.is_global
+
+def _interface_ipv6_addresses(path=None):
+    """读取网卡上的全局 IPv6 地址, 稳定地址排在临时 (隐私扩展) 地址之前"""
+    stable, temporary = [], []
+    with open(path or IF_INET6_PATH, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 6 or int(fields[3], 16) != 0:   # scope 0 为全局地址
+                continue
+            flags = int(fields[4], 16)
+            if flags & IFA_F_UNUSABLE:
+                continue
+            ip = str(ipaddress.IPv6Address(int(fields[0], 16)))
+            (temporary if flags & IFA_F_TEMPORARY else stable).append(ip)
+    return stable + temporary
+
+def _interface_ipv4_addresses(path=None):
+    """从路由表中读取本机 (host LOCAL) IPv4 地址"""
+    addresses, leaf = [], None
+    with open(path or FIB_TRIE_PATH, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("|--"):
+                leaf = line[3:].strip()
+            elif leaf and line.startswith("/32 host LOCAL") and leaf not in addresses:
+                addresses.append(leaf)
+    return addresses
+
+def _local_source(version: str, timeout: float):
+    """本机网卡上直接绑定的公网地址, 无需任何网络请求 (仅 Linux)"""
+    try:
+        candidates = _interface_ipv6_addresses() if version == 'v6' else _interface_ipv4_addresses()
+    except (OSError, ValueError):
+        return None
+    return next((ip for ip in candidates if _global(ip, version)), None)
+
+def _route_source(version: str, timeout: float):
+    """通过 UDP 套接字的路由选择得到默认出口地址 (不发送任何数据), 只在其为公网地址时采用"""
+    family, target = (socket.AF_INET6, "2606:4700:4700::1111") if version == 'v6' else (socket.AF_INET, "1.1.1.1")
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.connect((target, 53))
+            ip = sock.getsockname()[0]
+    except OSError:
+        return None
+    return ip if _global(ip, version) else None
+
+def _http_source(version: str, timeout: float):
+    return _race_endpoints(version, timeout)
+
+# 地址来源: name -> func(version, timeout), 返回地址或 None
+SOURCES = {"local": _local_source, "route": _route_source, "http": _http_source}
+
+def register_address_source(name: str, func):
+    """注册自定义地址来源, 之后可在 sources 参数中按名称使用"""
+    SOURCES[name] = func
+
+def _race_endpoints(version: str, timeout: float):
+    """同时查询全部端点, 返回第一个有效的地址; 其余请求的结果直接丢弃"""
+    endpoints = [api for api in API_ENDPOINTS if api.get(version)]
+    results = queue.Queue()
+    done = threading.Event()
+
+    def worker(api):
+        ip = _query_endpoint(api, version, timeout)
+        if not done.is_set():
+            results.put(ip)
+
+    for api in endpoints:
+        # 守护线程: 已有结果后, 仍在等待的慢端点不会阻塞调用方或程序退出
+        threading.Thread(target=worker, args=(api,), daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    try:
+        for _ in endpoints:
+            ip = results.get(timeout=max(0.0, deadline - time.monotonic()))
+            if ip:
+                return ip
+    except queue.Empty:
+        pass
+    finally:
+        done.set()
+    return None
+
+def get_public_ip(version='v4', use_cache=True, sources=None):
+    """
+    获取本机的公网 IP 地址，支持v4和v6。按 sources (默认 ADDRESS_SOURCES) 的顺序依次尝试各个来源,
+    HTTP 来源会并发查询多个API; 结果缓存 CACHE_TTL 秒。
+    """
+    sources = tuple(sources or ADDRESS_SOURCES)
+    unknown = [name for name in sources if name not in SOURCES]
+    if unknown:
+        return None, f"未知的地址来源: {', '.join(unknown)}"
+    key = (version, sources)
+    now = time.monotonic()
+    if use_cache:
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0], None
+
+    ip = None
+    for name in sources:
         try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            
+            ip = SOURCES[name](version, TIMEOUT)
+        except Exception:  # 自定义来源出错时继续尝试下一个来源
             ip = None
-            if api['type'] == 'text':
-                ip = response.text.strip()
-            elif api['type'] == 'json':
-                data = response.json()
-                ip = data.get('ip') or data.get('origin')
-            
-            if ip:
-                # 如果是 httpbin.org (或其他可能返回多个IP的)，取第一个
-                return ip.split(',')[0].strip(), None
+        if ip:
+            break
+    if ip is None:
+        # 如果所有来源都失败了
+        return None, f"获取公网IP({version})失败: {'/'.join(sources)} 均未得到有效地址。"
+    with _cache_lock:
+        _cache[key] = (ip, time.monotonic() + CACHE_TTL)
+    return ip, None
+
+def get_public_ips(versions=('v4', 'v6'), use_cache=True, sources=None):
+    """同时获取多个版本的公网地址, 返回 {version: (ip, error)}"""
+    results = {}
+
+    def worker(version):
+        results[version] = get_public_ip(version, use_cache=use_cache, sources=sources)
 
-        except requests.RequestException:
-            # 如果一个API失败，继续尝试下一个
-            continue
+    threads = [threading.Thread(target=worker, args=(version,), daemon=True) for version in versions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {version: results[version] for version in versions}
 
-    # 如果所有API都失败了
-    return None, f"获取公网IP({version})失败: 所有API均无响应或返回错误。"
+def clear_ip_cache():
+    """清除缓存的公网地址, 例如网络发生变化之后"""
+    with _cache_lock:
+        _cache.clear()
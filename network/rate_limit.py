@@ -0,0 +1,243 @@
+# rate_limit.py
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# 请求的优先级: 交互请求 (用户点击、CLI 命令) 先于后台请求 (预取) 获得令牌
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_context = threading.local()
+
+def current_priority() -> int:
+    """当前线程发出的请求的优先级, 默认为交互请求"""
+    return getattr(_context, "priority", INTERACTIVE)
+
+@contextmanager
+def request_priority(priority: int):
+    """在 with 块内, 当前线程发出的请求使用指定优先级"""
+    previous = current_priority()
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+def background_requests():
+    """with background_requests(): 块内的请求为后台请求, 如预取"""
+    return request_priority(BACKGROUND)
+
+def inherit_priority(func):
+    """包装 func, 使其在其他线程 (如线程池) 中执行时沿用调用方的优先级"""
+    priority = current_priority()
+
+    def wrapper(*args, **kwargs):
+        with request_priority(priority):
+            return func(*args, **kwargs)
+    return wrapper
+
+def parse_retry_after(value, now=None):
+    """解析 Retry-After 响应头 (秒数或 HTTP 日期), 返回等待秒数; 无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - (time.time() if now is None else now))
+
+class TokenBucket:
+    """
+    令牌桶: 每秒补充 rate 个令牌, 最多积累 capacity 个。
+    blocked_until 之前 (收到 429 之后) 不发放任何令牌。非线程安全, 由 RequestScheduler 加锁使用。
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._clock = clock
+        self._updated = clock()
+
+    def take(self, reserve: float = 0.0) -> float:
+        """取一个令牌 (取后剩余不少于 reserve), 成功返回 0, 否则返回需要等待的秒数"""
+        now = self._clock()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens - 1 >= reserve:
+            self.tokens -= 1
+            return 0.0
+        return (reserve + 1 - self.tokens) / self.rate
+
+class RequestScheduler:
+    """
+    进程内共享的请求调度器, 每个账户一个令牌桶。
+    桶的大小按 Cloudflare 的账户配额 (QUOTA 次/WINDOW 秒) 计算: 突发 BURST 个, 其余平均分布在窗口内,
+    保证任意窗口内的请求数不超过配额。后台请求不能动用最后 RESERVE 比例的令牌, 且有交互请求在等待时让行。
+    execute 在 429/5xx 时按 Retry-After 或带抖动的指数退避重试; 429 会暂停该账户的全部请求。
+    """
+    QUOTA = 1200            # 每个账户在窗口内允许的请求数
+    WINDOW = 300            # 配额窗口 (秒)
+    BURST = 200             # 允许的突发请求数
+    RESERVE = 0.25          # 为交互请求保留的令牌比例
+    MAX_RETRIES = 4         # 单个请求的最大重试次数
+    BACKOFF_BASE = 1.0      # 首次重试的等待时间 (秒), 此后每次翻倍
+    MAX_BACKOFF = 60        # 退避等待的上限 (秒)
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    # 5xx 时只重试幂等的请求; 429 表示请求未被处理, 任何方法都可以重试
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+    YIELD_INTERVAL = 0.1    # try_acquire 的后台请求为交互请求让行时建议的等待时间 (秒)
+
+    def __init__(self, quota: int = QUOTA, window: float = WINDOW, burst: int = BURST,
+                 clock=time.monotonic, sleep=time.sleep, rand=random.random):
+        self.quota = quota
+        self.window = window
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._random = rand
+        self._cond = threading.Condition()
+        self._buckets = {}          # 账户 -> TokenBucket
+        self._waiting = {}          # 账户 -> [等待中的交互请求数, 等待中的后台请求数]
+        self._stats = {"requests": 0, "throttled": 0, "rate_limited": 0, "retries": 0, "wait_seconds": 0.0}
+
+    def _new_bucket(self, quota, window, burst):
+        burst = min(burst, quota - 1)
+        return TokenBucket((quota - burst) / window, burst, self._clock)
+
+    def set_quota(self, key, quota: int, window: float = WINDOW, burst: int = BURST):
+        """为某个账户设置不同的配额 (例如企业账户)"""
+        with self._cond:
+            self._buckets[key] = self._new_bucket(quota, window, burst)
+            self._cond.notify_all()
+
+    def _bucket_locked(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = self._new_bucket(self.quota, self.window, self.burst)
+        return bucket
+
+    def _take_locked(self, key, bucket, priority):
+        """调用方需持有 self._cond。取一个令牌, 成功返回 0, 否则返回等待秒数; 后台请求需为交互请求让行时返回 None"""
+        if priority != INTERACTIVE and self._waiting.get(key, (0, 0))[INTERACTIVE]:
+            return None
+        return bucket.take(0.0 if priority == INTERACTIVE else bucket.capacity * self.RESERVE)
+
+    def _count_locked(self, waited):
+        self._stats["requests"] += 1
+        if waited:
+            self._stats["throttled"] += 1
+            self._stats["wait_seconds"] += waited
+
+    def acquire(self, key, priority=None) -> float:
+        """阻塞直到该账户有可用令牌, 返回等待的秒数"""
+        priority = current_priority() if priority is None else priority
+        start = self._clock()
+        with self._cond:
+            bucket = self._bucket_locked(key)
+            waiting = self._waiting.setdefault(key, [0, 0])
+            waiting[priority] += 1
+            throttled = False
+            try:
+                while True:
+                    delay = self._take_locked(key, bucket, priority)
+                    if delay == 0:
+                        break
+                    throttled = True
+                    # delay 为 None 时等交互请求取走令牌后被唤醒
+                    self._cond.wait(delay if delay is not None else 1.0)
+                    bucket = self._buckets[key]
+            finally:
+                waiting[priority] -= 1
+                self._cond.notify_all()
+            waited = self._clock() - start if throttled else 0.0
+            self._count_locked(waited)
+        return waited
+
+    def try_acquire(self, key, priority=INTERACTIVE, waited: float = 0.0) -> float:
+        """
+        不阻塞地尝试取一个令牌, 成功返回 0, 否则返回建议等待的秒数, 供协程 await asyncio.sleep 后重试。
+        waited 为调用方此前已等待的秒数, 取得令牌时计入统计。
+        """
+        with self._cond:
+            delay = self._take_locked(key, self._bucket_locked(key), priority)
+            if delay == 0:
+                self._count_locked(waited)
+                return 0.0
+        return delay if delay is not None else self.YIELD_INTERVAL
+
+    def pause(self, key, seconds: float):
+        """收到 429 后暂停该账户的全部请求"""
+        with self._cond:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.blocked_until = max(bucket.blocked_until, self._clock() + seconds)
+                bucket.tokens = 0.0
+
+    def retry_delay(self, key, method: str, status: int, retry_after=None, attempt: int = 0):
+        """
+        根据响应判断是否重试, 返回等待秒数, 不重试时返回 None (status 为 None 表示连接错误)。
+        429 时该账户暂停到 Retry-After 指定的时间。
+        """
+        if attempt >= self.MAX_RETRIES:
+            return None
+        if status != 429 and (status not in self.RETRY_STATUS | {None} or method.upper() not in self.IDEMPOTENT_METHODS):
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            # 等额抖动: 一半固定, 一半随机, 避免多个线程同时重试
+            backoff = min(self.BACKOFF_BASE * 2 ** attempt, self.MAX_BACKOFF)
+            delay = backoff / 2 + self._random() * backoff / 2
+        with self._cond:
+            self._stats["retries"] += 1
+            if status == 429:
+                self._stats["rate_limited"] += 1
+        if status == 429:
+            self.pause(key, delay)
+        return delay
+
+    def execute(self, key, method: str, send, retry_exceptions=()):
+        """
+        按调度发出请求: send() 返回带 status_code 和 headers 的响应。
+        需要重试时等待后重新获取令牌, 返回最后一次的响应; 重试用尽的连接错误原样抛出。
+        """
+        attempt = 0
+        while True:
+            self.acquire(key)
+            try:
+                response = send()
+            except retry_exceptions:
+                status = None
+                delay = self.retry_delay(key, method, status, attempt=attempt)
+                if delay is None:
+                    raise
+            else:
+                status = response.status_code
+                delay = self.retry_delay(key, method, status, response.headers.get("Retry-After"), attempt)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            if status != 429:
+                # 429 已暂停整个账户, 下一次 acquire 会等到暂停结束
+                self._sleep(delay)
+
+    def stats(self):
+        """已发出的请求数、等待令牌的次数 (throttled)、收到 429 的次数、重试次数和累计等待时间"""
+        with self._cond:
+            return dict(self._stats)
+
+_default_scheduler = RequestScheduler()
+
+def default_scheduler() -> RequestScheduler:
+    """进程内所有 API 客户端共用的调度器"""
+    return _default_scheduler
@@ -0,0 +1,79 @@
+# prefetch.py
+import itertools
+import queue
+import threading
+
+class Prefetcher:
+    """
+    在后台用少量工作线程预取各个域名的记录。
+    任务按优先级出队 (数值越小越先执行); 用户点击的域名由前台直接获取, 并通过 discard 从队列中移除。
+    fetch_func(zone_id, context) 返回 (result, error), 完成后在工作线程中调用 on_result(zone_id, result, error, context);
+    context 在 schedule 时给出 (如所属账户), 执行时不再读取调用方的当前状态。
+    """
+    PRIORITY_BACKGROUND = 10
+
+    def __init__(self, fetch_func, on_result, workers: int = 2):
+        self._fetch = fetch_func
+        self._on_result = on_result
+        self._workers = max(1, workers)
+        self._queue = queue.PriorityQueue()
+        self._entries = {}          # zone_id -> 队列中仍有效的条目
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_workers(self):
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _push(self, zone_id, priority, context):
+        # 调用方需持有 self._lock; 旧条目仅标记为失效, 出队时跳过
+        old = self._entries.get(zone_id)
+        if old is not None:
+            old[3] = False
+        entry = [priority, next(self._counter), zone_id, True, context]
+        self._entries[zone_id] = entry
+        self._queue.put(entry)
+
+    def schedule(self, zone_ids, priority: int = PRIORITY_BACKGROUND, context=None):
+        """按给定顺序排入预取队列, 替换之前尚未执行的预取任务; context 原样传给 fetch_func 和 on_result"""
+        with self._lock:
+            for entry in self._entries.values():
+                entry[3] = False
+            self._entries.clear()
+            for zone_id in zone_ids:
+                self._push(zone_id, priority, context)
+        self._ensure_workers()
+
+    def discard(self, zone_id):
+        """从队列中移除尚未执行的预取任务"""
+        with self._lock:
+            entry = self._entries.pop(zone_id, None)
+            if entry is not None:
+                entry[3] = False
+
+    def cancel_all(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry[3] = False
+            self._entries.clear()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            with self._lock:
+                if not entry[3]:
+                    continue
+                zone_id, context = entry[2], entry[4]
+                del self._entries[zone_id]
+            try:
+                result, error = self._fetch(zone_id, context)
+            except Exception as e:  # 预取失败不应终止工作线程
+                result, error = None, str(e)
+            self._on_result(zone_id, result, error, context)
@@ -0,0 +1,157 @@
+# record_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from config_loader import CONFIG_DIR
+
+CACHE_PATH = os.path.join(CONFIG_DIR, 'cloudflare-dns-manager_cache.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS zones (
+    account  TEXT NOT NULL,
+    id       TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data     TEXT NOT NULL,
+    PRIMARY KEY (account, id)
+);
+CREATE TABLE IF NOT EXISTS records (
+    zone_id     TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    modified_on TEXT,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (zone_id, id)
+);
+CREATE TABLE IF NOT EXISTS zone_usage (
+    account   TEXT NOT NULL,
+    zone_id   TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (account, zone_id)
+);
+CREATE TABLE IF NOT EXISTS zone_sync (
+    zone_id   TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+class RecordCache:
+    """
+    本地 SQLite 记录缓存, 按账户保存域名列表, 按 (zone_id, record_id) 保存解析记录。
+    启动时先从缓存渲染, 再在后台用 API 结果重新校验, 只写入 modified_on 发生变化的记录。
+    所有方法都是线程安全的; 缓存不可用时退回到内存数据库, 不影响正常使用。
+    """
+
+    def __init__(self, account: str, path: str = CACHE_PATH):
+        self.account = account
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = self._connect(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"本地缓存不可用, 将仅在内存中缓存: {e}")
+            self._conn = self._connect(":memory:")
+
+    @staticmethod
+    def _connect(path):
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL 模式下 GUI 和 CLI 可以同时读写同一个缓存文件
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_zones(self):
+        """返回缓存的域名列表, 从未缓存过时返回 None"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM zones WHERE account = ? ORDER BY position", (self.account,)).fetchall()
+        return [json.loads(data) for data, in rows] if rows else None
+
+    def save_zones(self, zones):
+        """用最新的域名列表替换当前账户的缓存"""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM zones WHERE account = ?", (self.account,))
+            self._conn.executemany(
+                "INSERT INTO zones (account, id, position, data) VALUES (?, ?, ?, ?)",
+                [(self.account, zone['id'], i, json.dumps(zone)) for i, zone in enumerate(zones)])
+
+    def get_records(self, zone_id: str):
+        """返回缓存的解析记录, 该区域从未同步过时返回 None"""
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM zone_sync WHERE zone_id = ?", (zone_id,)).fetchone():
+                return None
+            rows = self._conn.execute("SELECT data FROM records WHERE zone_id = ?", (zone_id,)).fetchall()
+        records = [json.loads(data) for data, in rows]
+        records.sort(key=lambda r: (r.get('type', ''), r.get('name', '')))
+        return records
+
+    def get_all_records(self):
+        """返回当前账户所有已缓存域名的记录 {zone_id: records}, 用于构建跨域名的反查索引"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.zone_id, r.data FROM records r JOIN zones z ON z.id = r.zone_id WHERE z.account = ?",
+                (self.account,)).fetchall()
+        result = {}
+        for zone_id, data in rows:
+            result.setdefault(zone_id, []).append(json.loads(data))
+        return result
+
+    def sync_records(self, zone_id: str, records) -> bool:
+        """
+        以 API 返回的完整记录列表校验缓存: 只写入新增或 modified_on 变化的记录, 删除已不存在的记录。
+        缓存内容有变化时返回 True。
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            cached = dict(self._conn.execute(
+                "SELECT id, modified_on FROM records WHERE zone_id = ?", (zone_id,)).fetchall())
+            synced = self._conn.execute("SELECT 1 FROM zone_sync WHERE zone_id = ?", (zone_id,)).fetchone()
+
+            changed = [(zone_id, r['id'], r.get('modified_on'), json.dumps(r)) for r in records
+                       if r['id'] not in cached or cached[r['id']] != r.get('modified_on')]
+            removed = cached.keys() - {r['id'] for r in records}
+
+            if changed:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (zone_id, id, modified_on, data) VALUES (?, ?, ?, ?)", changed)
+            if removed:
+                self._conn.executemany(
+                    "DELETE FROM records WHERE zone_id = ? AND id = ?", [(zone_id, rid) for rid in removed])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO zone_sync (zone_id, synced_at) VALUES (?, ?)", (zone_id, time.time()))
+        return bool(changed or removed or not synced)
+
+    def upsert_records(self, zone_id: str, records):
+        """写入单条修改 (新增/更新) 的结果, 无需重新校验整个域名"""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (zone_id, id, modified_on, data) VALUES (?, ?, ?, ?)",
+                [(zone_id, r['id'], r.get('modified_on'), json.dumps(r)) for r in records])
+
+    def delete_records(self, zone_id: str, record_ids):
+        """删除已在线上删除的记录"""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "DELETE FROM records WHERE zone_id = ? AND id = ?", [(zone_id, rid) for rid in record_ids])
+
+    def touch_zone(self, zone_id: str):
+        """记录域名最近一次被打开的时间, 用于按最近使用顺序预取"""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO zone_usage (account, zone_id, last_used) VALUES (?, ?, ?)",
+                               (self.account, zone_id, time.time()))
+
+    def recent_zone_ids(self, limit=None):
+        """按最近使用时间倒序返回域名 ID"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT zone_id FROM zone_usage WHERE account = ? ORDER BY last_used DESC LIMIT ?",
+                (self.account, -1 if limit is None else limit)).fetchall()
+        return [zone_id for zone_id, in rows]
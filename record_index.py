@@ -0,0 +1,239 @@
+# record_index.py
+import bisect
+import ipaddress
+
+# 查询中表示 "开启代理" / "未开启代理" 的写法
+TRUE_WORDS = {"yes", "y", "true", "1", "on", "是"}
+FALSE_WORDS = {"no", "n", "false", "0", "off", "否"}
+
+def parse_query(query: str):
+    """
+    解析筛选条件, 空格分隔的多个条件需同时满足:
+      type:A          按记录类型 (可用逗号分隔多个, 如 type:A,AAAA)
+      proxied:yes/no  按代理状态
+      name:xx         名称包含 xx;  content:xx  内容包含 xx
+      ^xx             名称或内容以 xx 开头 (也可写 name:^xx)
+      其他            名称或内容包含该子串 (不区分大小写)
+    返回 (types, proxied, terms), terms 为 [(field, text, prefix)]。
+    """
+    types, proxied, terms = None, None, []
+    for token in query.lower().split():
+        field, sep, value = token.partition(":")
+        if not sep or field not in ("type", "proxied", "name", "content"):
+            field, value = None, token
+        if field == "type":
+            types = {t.upper() for t in value.split(",") if t}
+            continue
+        if field == "proxied":
+            proxied = True if value in TRUE_WORDS else False if value in FALSE_WORDS else proxied
+            continue
+        prefix = value.startswith("^")
+        value = value[1:] if prefix else value
+        if value:
+            terms.append((field, value, prefix))
+    return types, proxied, terms
+
+class RecordSearchIndex:
+    """
+    记录的内存检索索引。所有记录的名称和内容分别拼接成一个大字符串, 子串/前缀查询
+    通过 str.find 在 C 层扫描, 每条记录最多命中一次, 5 万条记录也能在每次按键时重新筛选。
+    update/remove/sync 只标记变化, 拼接字符串在下次查询时才重建; 查询是上一次查询的延伸时
+    (继续输入), 只在上一次的结果中筛选。
+    """
+
+    def __init__(self, records=()):
+        self._records = {}          # id -> record, 保持插入顺序
+        self._dirty = True
+        self._version = 0
+        self._ids = []
+        self._lines = {}
+        self._types = []
+        self._proxied = []
+        self._starts = {}
+        self._buffers = {}
+        self._last = None           # (version, query, 命中的序号)
+        self.sync(records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, record):
+        """新增或更新一条记录"""
+        if self._records.get(record['id']) != record:
+            self._records[record['id']] = record
+            self._touch()
+
+    def remove(self, record_id):
+        if self._records.pop(record_id, None) is not None:
+            self._touch()
+
+    def sync(self, records):
+        """以完整的记录列表替换索引内容, 没有变化时不做任何事"""
+        records = list(records)
+        new_ids = {r['id'] for r in records}
+        removed = [rid for rid in self._records if rid not in new_ids]
+        for rid in removed:
+            self.remove(rid)
+        for record in records:
+            self.update(record)
+
+    def _touch(self):
+        self._dirty = True
+        self._version += 1
+
+    def _rebuild(self):
+        # 每条记录占一行, 行首的 "\n" 使前缀查询只需查找 "\n" + 关键字
+        self._ids = list(self._records)
+        self._lines = {"name": [], "content": []}
+        self._types, self._proxied = [], []
+        for record in self._records.values():
+            self._lines["name"].append((record.get('name') or "").lower())
+            self._lines["content"].append((record.get('content') or "").lower())
+            self._types.append((record.get('type') or "").upper())
+            self._proxied.append(bool(record.get('proxied')))
+        self._buffers, self._starts = {}, {}
+        for field, lines in self._lines.items():
+            starts, offset = [], 0
+            for line in lines:
+                starts.append(offset)
+                offset += len(line) + 1
+            self._starts[field] = starts
+            self._buffers[field] = "\n" + "\n".join(lines) + "\n"
+        self._dirty = False
+
+    def _scan(self, field, text, prefix):
+        """在某个字段的拼接字符串中查找, 返回命中记录的序号集合"""
+        buffer, lines = self._buffers[field], self._lines[field]
+        needle = "\n" + text if prefix else text
+        if buffer.count(needle) * 8 > len(lines):
+            # 命中很多时逐行判断更快
+            if prefix:
+                return {i for i, line in enumerate(lines) if line.startswith(text)}
+            return {i for i, line in enumerate(lines) if text in line}
+
+        starts = self._starts[field]
+        hits = set()
+        pos = buffer.find(needle)
+        while pos != -1:
+            # buffer 开头多了一个 "\n", 序号按 pos 对应的行计算
+            index = bisect.bisect_right(starts, pos if prefix else pos - 1) - 1
+            hits.add(index)
+            if index + 1 >= len(starts):
+                break
+            # 同一条记录只计一次, 直接跳到下一条记录
+            pos = buffer.find(needle, starts[index + 1] + (0 if prefix else 1))
+        return hits
+
+    def _filter(self, indexes, types, proxied, terms):
+        """逐条判断 indexes 中的记录是否满足全部条件"""
+        if types is not None:
+            kinds = self._types
+            indexes = [i for i in indexes if kinds[i] in types]
+        if proxied is not None:
+            flags = self._proxied
+            indexes = [i for i in indexes if flags[i] == proxied]
+        for field, text, prefix in terms:
+            columns = [self._lines[field]] if field else [self._lines["name"], self._lines["content"]]
+            if prefix:
+                indexes = [i for i in indexes if any(c[i].startswith(text) for c in columns)]
+            else:
+                indexes = [i for i in indexes if any(text in c[i] for c in columns)]
+        return indexes
+
+    def _narrows_last(self, query):
+        """query 是否只是在上一次查询的最后一个子串条件后继续输入"""
+        last = self._last
+        if not last or last[0] != self._version or not query.startswith(last[1]):
+            return False
+        added = query[len(last[1]):]
+        if not added or " " in added or ":" in added:
+            return False
+        field = query.split()[-1].partition(":")[0]
+        return field not in ("type", "proxied")
+
+    def search(self, query: str):
+        """返回满足条件的记录 id 列表 (保持记录原有顺序); 空查询返回全部"""
+        query = " ".join(query.split())
+        if self._dirty:
+            self._rebuild()
+        if not query:
+            return list(self._ids)
+
+        types, proxied, terms = parse_query(query)
+        if self._narrows_last(query):
+            # 继续输入同一个子串条件: 结果只会变少, 在上次结果中筛选即可
+            indexes = self._filter(self._last[2], types, proxied, terms[-1:])
+        else:
+            # 先用最长的子串在拼接字符串中查找候选, 其余条件只在候选中判断
+            terms = sorted(terms, key=lambda term: len(term[1]), reverse=True)
+            if terms:
+                field, text, prefix = terms[0]
+                fields = (field,) if field else ("name", "content")
+                candidates = sorted(set().union(*(self._scan(f, text, prefix) for f in fields)))
+            else:
+                candidates = range(len(self._ids))
+            indexes = self._filter(candidates, types, proxied, terms[1:])
+        self._last = (self._version, query, indexes)
+        return [self._ids[i] for i in indexes]
+
+    def filter(self, query: str):
+        """返回满足条件的记录列表"""
+        return [self._records[rid] for rid in self.search(query)]
+
+def content_key(content: str) -> str:
+    """反查使用的内容键: IP 地址统一为标准写法, 主机名去掉末尾的点并转为小写"""
+    content = (content or "").strip()
+    try:
+        return str(ipaddress.ip_address(content))
+    except ValueError:
+        return content.rstrip(".").lower()
+
+class ContentIndex:
+    """
+    跨域名的反查索引: 记录内容 -> 指向该内容的记录, 用于查找某个 IP/目标被哪些记录引用。
+    以域名为单位整体替换 (update_zone), 每个域名的记录更新一次只需处理该域名本身。
+    """
+
+    def __init__(self):
+        self._by_content = {}       # content key -> {(zone_id, record_id): record}
+        self._zones = {}            # zone_id -> (zone_name, {record_id: content key})
+
+    def __len__(self):
+        return sum(len(keys) for _, keys in self._zones.values())
+
+    def __contains__(self, zone_id):
+        return zone_id in self._zones
+
+    def zone_name(self, zone_id):
+        entry = self._zones.get(zone_id)
+        return entry[0] if entry else None
+
+    def update_zone(self, zone_id, records, zone_name=None):
+        """用该域名的完整记录列表替换索引中的内容"""
+        self.remove_zone(zone_id)
+        keys = {}
+        for record in records:
+            key = content_key(record.get('content'))
+            keys[record['id']] = key
+            self._by_content.setdefault(key, {})[(zone_id, record['id'])] = record
+        self._zones[zone_id] = (zone_name, keys)
+
+    def remove_zone(self, zone_id):
+        entry = self._zones.pop(zone_id, None)
+        if entry is None:
+            return
+        for record_id, key in entry[1].items():
+            bucket = self._by_content.get(key)
+            if bucket is not None:
+                bucket.pop((zone_id, record_id), None)
+                if not bucket:
+                    del self._by_content[key]
+
+    def lookup(self, content, types=None):
+        """返回内容等于 content 的记录 [(zone_id, record)], types 可限定记录类型"""
+        bucket = self._by_content.get(content_key(content), {})
+        types = {t.upper() for t in types} if types else None
+        matches = [(zone_id, record) for (zone_id, _), record in bucket.items()
+                   if types is None or record.get('type', '').upper() in types]
+        matches.sort(key=lambda m: (self.zone_name(m[0]) or m[0], m[1].get('name', ''), m[1].get('type', '')))
+        return matches
@@ -0,0 +1,152 @@
+# task_pool.py
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class TaskHandle:
+    """提交到 TaskPool 的任务句柄, 取消后其回调不会再被调用"""
+
+    def __init__(self, callback_func, callback_kwargs, slot=None):
+        self.callback_func = callback_func
+        self.slot = slot
+        self.callback_kwargs = callback_kwargs
+        self.entry = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+class TaskPool:
+    """
+    固定大小的共享线程池, 替代每个操作新建一个线程:
+    - slot: 同一逻辑槽位 (如 "当前域名记录") 的新任务会取消旧任务, 旧任务的结果被丢弃;
+    - key:  相同 key 的任务正在执行时不会重复发起, 新的调用方直接等待同一个结果。
+    task_func 返回 (result, error), 完成后通过 deliver(callback_func, kwargs) 交给调用方。
+    """
+
+    def __init__(self, deliver, max_workers: int = 6):
+        self._deliver = deliver
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._lock = threading.Lock()
+        self._slots = {}        # slot -> TaskHandle
+        self._inflight = {}     # key -> {"future": Future, "handles": [TaskHandle]}
+
+    @staticmethod
+    def _run(task_func):
+        try:
+            return task_func()
+        except Exception as e:  # 任务异常按错误返回, 不影响线程池
+            return None, str(e)
+
+    def submit(self, task_func, callback_func, callback_kwargs=None, slot=None, key=None) -> TaskHandle:
+        handle = TaskHandle(callback_func, callback_kwargs or {}, slot)
+        superseded, new_entry = None, None
+        with self._lock:
+            entry = self._inflight.get(key) if key is not None else None
+            if slot is not None:
+                previous = self._slots.get(slot)
+                if previous is not None:
+                    if entry is not None and previous.entry is entry:
+                        # 被替换的是同一个请求: 只取消旧句柄, 新句柄继续等待该请求的结果
+                        previous.cancel()
+                    else:
+                        superseded = self._cancel_locked(previous)
+                self._slots[slot] = handle
+
+            if entry is not None:
+                # 合并到正在执行的相同请求
+                entry["handles"].append(handle)
+                handle.entry = entry
+            else:
+                entry = {"handles": [handle], "cancellable": True, "key": key}
+                handle.entry = entry
+                if key is not None:
+                    self._inflight[key] = entry
+                entry["future"] = self._executor.submit(self._run, task_func)
+                new_entry = entry
+        if new_entry is not None:
+            new_entry["future"].add_done_callback(lambda future: self._finish(key, new_entry, future))
+        # 取消 future 会同步触发其完成回调, 必须在释放锁之后进行
+        if superseded is not None:
+            self._cancel_entry(superseded)
+        return handle
+
+    def call(self, key, task_func):
+        """
+        在当前线程中同步执行 task_func 并返回其结果; 若相同 key 的任务正在执行则等待其结果。
+        供自带工作线程的组件 (如预取器) 与前台请求共享同一次网络调用。
+        """
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is None:
+                entry = {"handles": [], "future": Future(), "cancellable": False}
+                self._inflight[key] = entry
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return entry["future"].result()
+
+        result = self._run(task_func)
+        entry["future"].set_result(result)
+        self._finish(key, entry, entry["future"])
+        return result
+
+    def _finish(self, key, entry, future):
+        with self._lock:
+            if key is not None and self._inflight.get(key) is entry:
+                del self._inflight[key]
+            handles = list(entry["handles"])
+            for handle in handles:
+                if handle.slot is not None and self._slots.get(handle.slot) is handle:
+                    del self._slots[handle.slot]
+        if future.cancelled():
+            return
+        result, error = future.result()
+        for handle in handles:
+            if not handle.cancelled:
+                self._deliver(handle.callback_func, {"result": result, "error": error, **handle.callback_kwargs})
+
+    def _cancel_locked(self, handle):
+        """
+        调用方需持有 self._lock。取消句柄; 若同一请求的所有等待者都已取消且请求尚未开始执行,
+        将其从 _inflight 中移除并返回, 由调用方在释放锁后通过 _cancel_entry 取消。
+        已在执行的请求保留在 _inflight 中, 之后相同 key 的任务仍合并到它上面, 不会重复发起网络请求。
+        """
+        handle.cancel()
+        entry = handle.entry
+        if not entry or not entry.get("cancellable") or not all(h.cancelled for h in entry["handles"]):
+            return None
+        future = entry["future"]
+        if future.running() or future.done():
+            return None
+        key = entry.get("key")
+        if key is not None and self._inflight.get(key) is entry:
+            del self._inflight[key]
+        return entry
+
+    def _cancel_entry(self, entry):
+        """取消 _cancel_locked 返回的请求; 若它在此期间已开始执行, 放回 _inflight 供相同请求合并"""
+        future = entry["future"]
+        if future.cancel():
+            return
+        key = entry.get("key")
+        with self._lock:
+            if key is not None and not future.done() and key not in self._inflight:
+                self._inflight[key] = entry
+
+    def cancel_slot(self, slot):
+        """取消某个槽位上仍未完成的任务"""
+        entry = None
+        with self._lock:
+            handle = self._slots.pop(slot, None)
+            if handle is not None:
+                entry = self._cancel_locked(handle)
+        if entry is not None:
+            self._cancel_entry(entry)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
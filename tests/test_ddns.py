@@ -0,0 +1,42 @@
+# test_ddns.py
+from ddns import DDNSUpdater
+
+class FakeAPI:
+    def __init__(self, records):
+        self.records = {r['id']: dict(r) for r in records}
+        self.patches = []
+
+    def get_zones(self):
+        return [{"id": "z1", "name": "ex.com"}], None
+
+    def get_dns_records(self, zone_id):
+        return [dict(r) for r in self.records.values()], None
+
+    def bulk_mutate(self, zone_id, deletes=(), patches=(), posts=(), progress_callback=None):
+        succeeded = []
+        for item in patches:
+            self.patches.append(item)
+            self.records[item['id']].update(item)
+            succeeded.append(("patch", item, dict(self.records[item['id']])))
+        return {"succeeded": succeeded, "failed": []}, None
+
+def make_updater(api, ip):
+    target = {"zone": "ex.com", "name": "home.ex.com", "type": "A", "version": "v4", "proxied": False, "ttl": 1}
+    return DDNSUpdater(api, [target], ip_func=lambda versions: {"v4": (ip, None)}, log=lambda message: None)
+
+def test_all_records_of_a_host_are_updated_and_reported_once():
+    api = FakeAPI([
+        {"id": "r1", "name": "home.ex.com", "type": "A", "content": "192.0.2.1"},
+        {"id": "r2", "name": "home.ex.com", "type": "A", "content": "192.0.2.2"},
+        {"id": "r3", "name": "home.ex.com", "type": "A", "content": "198.51.100.7"},
+    ])
+    updater = make_updater(api, "198.51.100.7")
+    summary, error = updater.run_once()
+    assert error is None
+    assert sorted(item['id'] for item in api.patches) == ["r1", "r2"]
+    assert summary["updated"] == ["home.ex.com"]
+    assert all(r['content'] == "198.51.100.7" for r in api.records.values())
+
+    summary, error = updater.run_once()
+    assert summary["unchanged"] == 1 and summary["updated"] == []
+    assert len(api.patches) == 2
@@ -0,0 +1,48 @@
+# test_dns_sync.py
+from dns_sync import desired_records_from_file, import_records, plan_changes, plan_is_empty
+from zone_files import export_zone
+
+ZONE = {"id": "zone", "name": "ex.com"}
+LIVE = [
+    {"id": "1", "type": "A", "name": "ex.com", "content": "192.0.2.1", "ttl": 1, "proxied": True},
+    {"id": "2", "type": "CNAME", "name": "www.ex.com", "content": "ex.com", "ttl": 1, "proxied": True},
+    {"id": "3", "type": "MX", "name": "ex.com", "content": "mail.ex.com", "priority": 10, "ttl": 3600,
+     "proxied": False},
+    {"id": "4", "type": "SRV", "name": "_sip._udp.ex.com", "content": "5 5060 sip.ex.com", "priority": 10,
+     "ttl": 1, "proxied": False},
+    {"id": "5", "type": "TXT", "name": "ex.com", "content": "v=spf1 include:_spf.ex.com ~all", "ttl": 300,
+     "proxied": False},
+    {"id": "6", "type": "NS", "name": "ex.com", "content": "ada.ns.cloudflare.com", "ttl": 86400,
+     "proxied": False},
+]
+
+class FakeAPI:
+    def iter_dns_records(self, zone_id):
+        yield [dict(r) for r in LIVE], None
+
+def test_plan_against_fresh_export_is_empty(tmp_path):
+    path = str(tmp_path / "ex.com.zone")
+    count, error = export_zone(FakeAPI(), ZONE, path)
+    assert error is None and count == len(LIVE)
+
+    plan = plan_changes(LIVE, desired_records_from_file(path, ZONE["name"]), ZONE["name"])
+    assert plan_is_empty(plan), plan
+
+class RecordingAPI:
+    def __init__(self):
+        self.calls = []
+
+    def bulk_mutate(self, zone_id, deletes=(), patches=(), posts=(), progress_callback=None):
+        self.calls.append({"deletes": list(deletes), "posts": list(posts)})
+        return {"succeeded": [], "failed": []}, None
+
+def test_import_prune_keeps_apex_ns(tmp_path):
+    path = tmp_path / "ex.com.zone"
+    path.write_text("$ORIGIN ex.com.\n@ 1 IN A 192.0.2.1\n", encoding="utf-8")
+    api = RecordingAPI()
+
+    result, error = import_records(api, ZONE, str(path), prune=True, live_records=[dict(r) for r in LIVE])
+    assert error is None
+    deleted = {r["id"] for r in result["deletes"]}
+    assert "6" not in deleted
+    assert deleted == {"2", "3", "4", "5"}
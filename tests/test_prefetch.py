@@ -0,0 +1,24 @@
+# test_prefetch.py
+import threading
+from prefetch import Prefetcher
+
+def test_context_given_at_schedule_is_passed_to_fetch_and_result():
+    results = []
+    done = threading.Event()
+    gate = threading.Event()
+
+    def fetch(zone_id, context):
+        gate.wait(5)
+        return f"{context}:{zone_id}", None
+
+    def on_result(zone_id, result, error, context):
+        results.append((zone_id, result, context))
+        if len(results) == 2:
+            done.set()
+
+    prefetcher = Prefetcher(fetch, on_result, workers=1)
+    prefetcher.schedule(["z1", "z2"], context="account-a")
+    gate.set()
+
+    assert done.wait(5)
+    assert sorted(results) == [("z1", "account-a:z1", "account-a"), ("z2", "account-a:z2", "account-a")]
@@ -0,0 +1,29 @@
+# test_rate_limit.py
+from network.rate_limit import BACKGROUND, INTERACTIVE, RequestScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_try_acquire_returns_delay_without_blocking():
+    clock = FakeClock()
+    scheduler = RequestScheduler(quota=12, window=10, burst=2, clock=clock)
+
+    assert scheduler.try_acquire("account") == 0
+    assert scheduler.try_acquire("account") == 0
+    delay = scheduler.try_acquire("account")
+    assert delay == 1.0     # 每秒补充 (12 - 2) / 10 = 1 个令牌
+    clock.now += delay
+    assert scheduler.try_acquire("account", waited=delay) == 0
+
+    stats = scheduler.stats()
+    assert stats["requests"] == 3
+    assert stats["throttled"] == 1
+
+def test_background_keeps_reserve():
+    scheduler = RequestScheduler(quota=41, window=10, burst=4, clock=FakeClock())
+    assert [scheduler.try_acquire("account", BACKGROUND) for _ in range(4)][-1] > 0
+    assert scheduler.try_acquire("account", INTERACTIVE) == 0
@@ -0,0 +1,103 @@
+# test_task_pool.py
+import threading
+from task_pool import TaskPool
+
+def make_pool(workers=1):
+    delivered = []
+    done = threading.Event()
+
+    def deliver(callback, kwargs):
+        callback(**kwargs)
+
+    return TaskPool(deliver, workers), delivered, done
+
+def test_resubmit_same_slot_and_key_while_queued_delivers_callback():
+    pool, delivered, done = make_pool(workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+        return None, None
+
+    pool.submit(blocker, lambda result, error: None)
+    assert started.wait(5)
+
+    key = ("records", "account", "zone")
+    first = []
+
+    def on_second(result, error):
+        delivered.append(result)
+        done.set()
+
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return "records", None
+
+    pool.submit(fetch, lambda result, error: first.append(result), slot="zone_records", key=key)
+    pool.submit(fetch, on_second, slot="zone_records", key=key)
+    release.set()
+
+    assert done.wait(5)
+    assert delivered == ["records"]
+    assert first == []
+    assert len(calls) == 1
+    pool.shutdown()
+
+def test_resubmit_same_slot_and_key_while_running_reuses_call():
+    pool, delivered, done = make_pool(workers=2)
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+    key = ("records", "account", "zone")
+    first = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "records", None
+
+    def on_second(result, error):
+        delivered.append(result)
+        done.set()
+
+    pool.submit(fetch, lambda result, error: first.append(result), slot="zone_records", key=key)
+    assert started.wait(5)
+    # 与 on_domain_selected 相同: 先取消槽位, 再以相同 key 重新提交
+    pool.cancel_slot("zone_records")
+    pool.submit(fetch, on_second, slot="zone_records", key=key)
+    release.set()
+
+    assert done.wait(5)
+    assert delivered == ["records"]
+    assert first == []
+    assert len(calls) == 1
+    pool.shutdown()
+
+def test_same_key_coalesces_into_one_call():
+    pool, delivered, done = make_pool(workers=1)
+    release = threading.Event()
+    calls = []
+
+    def task():
+        calls.append(1)
+        release.wait(5)
+        return "records", None
+
+    def on_result(result, error):
+        delivered.append(result)
+        if len(delivered) == 2:
+            done.set()
+
+    pool.submit(task, on_result, key=("records", "zone"))
+    pool.submit(task, on_result, key=("records", "zone"))
+    release.set()
+
+    assert done.wait(5)
+    assert delivered == ["records", "records"]
+    assert len(calls) == 1
+    pool.shutdown()
@@ -0,0 +1,51 @@
+# test_zone_files.py
+import pytest
+from zone_files import _tokenize, format_bind_record, parse_bind, parse_csv
+
+def round_trip_txt(content):
+    line = format_bind_record({"type": "TXT", "name": "ex.com", "content": content, "ttl": 1})
+    return line, next(parse_bind([line], "ex.com"))["content"]
+
+@pytest.mark.parametrize("content", [
+    "a" * 254 + "\\" + "b" * 10,
+    "a" * 255 + "\\" + "b" * 10,
+    "a" * 254 + '"' + "b" * 10,
+    "a" * 255 + '"' + "b" * 10,
+    "v=spf1 include:\"x\" \\ ~all",
+    "é" * 200,
+    "a" + "中文" * 150,
+    "",
+])
+def test_txt_round_trip(content):
+    _, parsed = round_trip_txt(content)
+    assert parsed == content
+
+def test_txt_strings_fit_in_255_bytes():
+    content = "a" + "中文" * 150 + "\\" * 300
+    line, _ = round_trip_txt(content)
+    tokens, quoted, _ = _tokenize(line)
+    strings = [t for t, q in zip(tokens, quoted) if q]
+    assert len(strings) > 1
+    assert all(len(s.encode("utf-8")) <= 255 for s in strings)
+    assert "".join(strings) == content
+
+def test_csv_names_relative_to_origin():
+    lines = ["type,name,content\n", "A,www.notex.com,192.0.2.1\n", "A,www.ex.com,192.0.2.2\n",
+             "A,ex.com,192.0.2.3\n", "A,@,192.0.2.4\n", "A,mail,192.0.2.5\n"]
+    names = [record["name"] for record in parse_csv(lines, "ex.com")]
+    assert names == ["www.notex.com.ex.com", "www.ex.com", "ex.com", "ex.com", "mail.ex.com"]
+
+@pytest.mark.parametrize("record", [
+    {"type": "MX", "name": "ex.com", "content": "mail.ex.com", "priority": 10, "ttl": 3600, "proxied": False},
+    {"type": "SRV", "name": "_sip._udp.ex.com", "content": "5 5060 sip.ex.com", "priority": 10, "ttl": 1,
+     "proxied": False},
+    {"type": "TXT", "name": "ex.com", "content": "v=spf1 include:_spf.ex.com ~all", "ttl": 300, "proxied": False},
+])
+def test_bind_export_parse_round_trip(record):
+    parsed = next(parse_bind([format_bind_record(record)], "ex.com"))
+    assert parsed == record
+
+def test_csv_priority_in_content():
+    lines = ["type,name,content\n", "SRV,_sip._udp,10 5 5060 sip.ex.com.\n", "MX,@,20 Mail.ex.com.\n"]
+    records = list(parse_csv(lines, "ex.com"))
+    assert [(r["content"], r["priority"]) for r in records] == [("5 5060 sip.ex.com", 10), ("mail.ex.com", 20)]
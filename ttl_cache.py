@@ -0,0 +1,99 @@
+# ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    容量有限、条目会过期的内存缓存, 用于 stale-while-revalidate:
+    超过 ttl 的条目仍然保留并可读取 (视为过期), 由调用方决定是否在后台刷新;
+    条目数超过 max_size 时按最近最少使用 (LRU) 淘汰。线程安全。
+    """
+
+    def __init__(self, max_size: int = 64, ttl: float = 300, clock=time.monotonic):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        """返回 (value, is_fresh), 未命中时返回 (None, False)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._data.move_to_end(key)
+            value, stored_at = entry
+            fresh = stored_at is not None and self._clock() - stored_at < self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, fresh
+
+    def get(self, key, default=None):
+        """返回缓存的值 (不论是否过期)"""
+        value, _ = self.lookup(key)
+        return default if value is None else value
+
+    def set(self, key, value, fresh: bool = True):
+        """写入条目; fresh 为 False 时条目立即视为过期 (例如来自磁盘缓存的数据)"""
+        with self._lock:
+            self._data[key] = (value, self._clock() if fresh else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def expire(self, key):
+        """将条目标记为过期, 保留其内容以便在刷新期间继续显示"""
+        with self._lock:
+            if key in self._data:
+                self._data[key] = (self._data[key][0], None)
+
+    def expire_all(self):
+        with self._lock:
+            for key in list(self._data):
+                self._data[key] = (self._data[key][0], None)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """命中/过期命中/未命中/淘汰计数, 用于诊断"""
+        with self._lock:
+            return {"size": len(self._data), "max_size": self.max_size, "hits": self.hits,
+                    "stale_hits": self.stale_hits, "misses": self.misses, "evictions": self.evictions}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key):
+        value, _ = self.lookup(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -5,7 +5,8 @@ import threading
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Gdk, Gio, Adw, GLib, Pango
+from gi.repository import Gtk, Gdk, Gio, Adw, GLib, Pango, GObject
+from record_index import RecordSearchIndex
 
 def show_gtk_message(parent, title, message, msg_type):
     # GTK 4 dialogs are non-blocking. We use an iteration loop to emulate synchronous behavior.
@@ -35,10 +36,11 @@ def show_gtk_message(parent, title, message, msg_type):
     return result['response'] in ["yes", "ok"]
 
 class ConfigEditor(Adw.Window):
-    def __init__(self, parent, controller):
+    def __init__(self, parent, controller, new_account=False):
         super().__init__(transient_for=parent, modal=True)
         self.controller = controller
-        self.set_title("Cloudflare API 配置")
+        self.new_account = new_account
+        self.set_title("添加账户" if new_account else "Cloudflare API 配置")
         self.set_default_size(400, -1)
         self.set_resizable(False)
 
@@ -54,6 +56,10 @@ class ConfigEditor(Adw.Window):
         group = Adw.PreferencesGroup()
         page.add(group)
 
+        # 新账户可以指定名称, 留空时以邮箱作为名称
+        self.name_row = Adw.EntryRow(title="账户名称 (可选)", visible=new_account)
+        group.add(self.name_row)
+
         self.email_row = Adw.EntryRow(title="Cloudflare Email")
         group.add(self.email_row)
 
@@ -85,7 +91,8 @@ class ConfigEditor(Adw.Window):
         if not email or not key:
             self.show_status("邮箱和API Key均不能为空。", "red")
             return
-        self.controller.test_and_save_config(email, key, self)
+        account = (self.name_row.get_text().strip() or email) if self.new_account else None
+        self.controller.test_and_save_config(email, key, self, account)
 
     def show_status(self, message, color):
         self.status_label.set_markup(f'<span foreground="{color}">{message}</span>')
@@ -117,7 +124,11 @@ class RecordEditor(Adw.Window):
         page.add(group)
 
         self.type_row = Adw.ComboRow(title="记录类型")
-        self.type_model = Gtk.StringList.new(["A", "AAAA", "CNAME", "TXT", "NS"])
+        record_types = ["A", "AAAA", "CNAME", "TXT", "NS"]
+        if record and record.get('type') not in record_types:
+            # 编辑其他类型 (如 MX) 的记录时也能显示原类型
+            record_types.append(record['type'])
+        self.type_model = Gtk.StringList.new(record_types)
         self.type_row.set_model(self.type_model)
         group.add(self.type_row)
 
@@ -145,7 +156,7 @@ class RecordEditor(Adw.Window):
 
         if record:
             # Set record values
-            type_idx = ["A", "AAAA", "CNAME", "TXT", "NS"].index(record.get('type', 'A'))
+            type_idx = record_types.index(record.get('type', 'A'))
             self.type_row.set_selected(type_idx)
             self.name_row.set_text(record.get('name', ''))
             self.content_row.set_text(record.get('content', ''))
@@ -173,7 +184,113 @@ class RecordEditor(Adw.Window):
         self.controller.add_or_update_record(record_data, self.record_id)
         self.close()
 
+class ReverseLookupWindow(Adw.Window):
+    # 跨域名反查: 查找内容为某个 IP/目标的全部记录, 并可批量替换为新内容
+    def __init__(self, parent, controller):
+        super().__init__(transient_for=parent, modal=True)
+        self.controller = controller
+        self.matches = []
+        self.set_title("反查记录")
+        self.set_default_size(560, 520)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.set_content(content)
+
+        header = Adw.HeaderBar()
+        content.append(header)
+
+        body = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10, margin_start=20, margin_end=20, margin_top=10, margin_bottom=20)
+        content.append(body)
+
+        self.search_entry = Gtk.SearchEntry(placeholder_text="IP 地址或目标主机名")
+        self.search_entry.connect("search-changed", lambda w: self.refresh())
+        body.append(self.search_entry)
+
+        self.status_label = Gtk.Label(xalign=0, wrap=True)
+        self.status_label.add_css_class("dim-label")
+        body.append(self.status_label)
+
+        scrolled = Gtk.ScrolledWindow(hexpand=True, vexpand=True)
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        body.append(scrolled)
+        self.results_list = Gtk.ListBox(selection_mode=Gtk.SelectionMode.NONE)
+        self.results_list.add_css_class("boxed-list")
+        scrolled.set_child(self.results_list)
+
+        replace_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        body.append(replace_box)
+        self.replace_entry = Gtk.Entry(placeholder_text="替换为新的内容", hexpand=True)
+        replace_box.append(self.replace_entry)
+        self.replace_button = Gtk.Button(label="全部替换")
+        self.replace_button.add_css_class("destructive-action")
+        self.replace_button.connect("clicked", self.on_replace_clicked)
+        replace_box.append(self.replace_button)
+
+        self.refresh()
+        self.present()
+
+    def refresh(self):
+        # 按当前输入重新查询, 结果来自控制器维护的反查索引
+        query = self.search_entry.get_text().strip()
+        self.results_list.remove_all()
+        self.matches, indexed = self.controller.reverse_lookup(query) if query else ([], 0)
+        for _, zone_name, record in self.matches:
+            row = Adw.ActionRow(title=record['name'], subtitle=f"{record['type']} · {zone_name}")
+            row.set_title_selectable(True)
+            self.results_list.append(row)
+        if query:
+            self.show_status(f"找到 {len(self.matches)} 条记录 (已索引 {indexed}/{len(self.controller.zones)} 个域名)")
+        else:
+            self.show_status("输入 IP 或主机名, 查找所有指向它的记录")
+        self.replace_button.set_sensitive(bool(self.matches))
+
+    def show_status(self, text):
+        self.status_label.set_text(text)
+
+    def on_replace_clicked(self, widget):
+        new_content = self.replace_entry.get_text().strip()
+        if not new_content:
+            show_gtk_message(self, "输入错误", "新的内容不能为空", "error")
+            return
+        self.controller.replace_records_content(list(self.matches), new_content, self)
+
+class RecordItem(GObject.Object):
+    # 记录列表中的一行; 属性变化时通过绑定自动刷新对应单元格
+    __gtype_name__ = "CfDnsRecordItem"
+
+    rid = GObject.Property(type=str, default="")
+    rtype = GObject.Property(type=str, default="")
+    name = GObject.Property(type=str, default="")
+    content = GObject.Property(type=str, default="")
+    proxied = GObject.Property(type=str, default="")
+
+    def __init__(self, record):
+        super().__init__()
+        self.record = None
+        self.update(record)
+
+    def update(self, record):
+        self.record = record
+        values = {"rid": record['id'], "rtype": record['type'], "name": record['name'],
+                  "content": record['content'], "proxied": "是" if record.get('proxied') else "否"}
+        for prop, value in values.items():
+            if self.get_property(prop) != value:
+                self.set_property(prop, value)
+
+class ZoneItem(GObject.Object):
+    # 域名侧边栏中的一项; index 为该域名在 controller.zones 中的位置
+    __gtype_name__ = "CfDnsZoneItem"
+
+    name = GObject.Property(type=str, default="")
+
+    def __init__(self, name, index):
+        super().__init__()
+        self.name = name
+        self.index = index
+
 class AppUI(Adw.ApplicationWindow):
+    RECORDS_CHUNK_SIZE = 500  # 大量记录分批在空闲时加入列表, 避免界面卡顿
+
     def __init__(self, application, controller):
         super().__init__(application=application)
         self.controller = controller
@@ -187,6 +304,10 @@ class AppUI(Adw.ApplicationWindow):
         header = Adw.HeaderBar()
         main_box.append(header)
 
+        reverse_lookup_button = Gtk.Button(icon_name="edit-find-symbolic", tooltip_text="反查记录 (跨域名查找指向某个 IP/目标的记录)")
+        reverse_lookup_button.connect("clicked", lambda w: self.controller.open_reverse_lookup())
+        header.pack_start(reverse_lookup_button)
+
         # Main Paned
         main_pane = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL, wide_handle=True)
         main_box.append(main_pane)
@@ -199,18 +320,40 @@ class AppUI(Adw.ApplicationWindow):
         self.refresh_domains_button.connect("clicked", lambda w: self.controller.load_domains())
         left_box.append(self.refresh_domains_button)
 
+        self.domain_search = Gtk.SearchEntry(placeholder_text="筛选域名")
+        self.domain_search.connect("search-changed", self.on_domain_search_changed)
+        left_box.append(self.domain_search)
+
+        self.domain_stack = Gtk.Stack(hexpand=True, vexpand=True)
+        left_box.append(self.domain_stack)
+
+        self.domain_message = Gtk.Label(wrap=True)
+        self.domain_message.add_css_class("dim-label")
+        self.domain_stack.add_named(self.domain_message, "message")
+
         scrolled_window = Gtk.ScrolledWindow(hexpand=True, vexpand=True)
         scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        left_box.append(scrolled_window)
-
-        self.domain_listbox = Gtk.ListBox()
-        self.domain_listbox.add_css_class("navigation-sidebar")
-        self.domain_listbox.connect("row-selected", self.on_domain_row_selected)
-        scrolled_window.set_child(self.domain_listbox)
+        self.domain_stack.add_named(scrolled_window, "list")
+
+        # ListView 只为可见行创建控件; 筛选在 GTK 内部完成, 行与域名的对应关系保存在 ZoneItem 上
+        self.domain_model = Gio.ListStore(item_type=ZoneItem)
+        self.domain_filter = Gtk.StringFilter.new(Gtk.PropertyExpression.new(ZoneItem, None, "name"))
+        self.domain_filter.set_ignore_case(True)
+        self.domain_filter.set_match_mode(Gtk.StringFilterMatchMode.SUBSTRING)
+        self.domain_filter_model = Gtk.FilterListModel(model=self.domain_model, filter=self.domain_filter, incremental=True)
+        self.domain_selection = Gtk.SingleSelection(model=self.domain_filter_model, autoselect=False, can_unselect=True)
+        self.domain_selection.connect("notify::selected-item", self.on_domain_selection_changed)
+
+        domain_factory = Gtk.SignalListItemFactory()
+        domain_factory.connect("setup", self.on_domain_row_setup)
+        domain_factory.connect("bind", self.on_domain_row_bind)
+        self.domain_listview = Gtk.ListView(model=self.domain_selection, factory=domain_factory)
+        self.domain_listview.add_css_class("navigation-sidebar")
+        scrolled_window.set_child(self.domain_listview)
 
         # Context menu for domains
         self.domain_popover = Gtk.PopoverMenu.new_from_model(None)
-        self.domain_popover.set_parent(self.domain_listbox)
+        self.domain_popover.set_parent(self.domain_listview)
         self.domain_popover.set_has_arrow(True)
         domain_menu = Gio.Menu.new()
         domain_menu.append("复制域名", "win.copy_domain")
@@ -219,11 +362,25 @@ class AppUI(Adw.ApplicationWindow):
         domain_gesture = Gtk.GestureClick.new()
         domain_gesture.set_button(Gdk.BUTTON_SECONDARY)
         domain_gesture.connect("pressed", self.on_domain_right_click)
-        self.domain_listbox.add_controller(domain_gesture)
+        self.domain_listview.add_controller(domain_gesture)
 
-        self.change_account_button = Gtk.Button(label="更改账户")
+        # 账户切换: 已打开过的账户保留连接和缓存, 切回时立即显示
+        account_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        left_box.append(account_box)
+
+        self.account_model = Gtk.StringList()
+        self.account_dropdown = Gtk.DropDown(model=self.account_model, hexpand=True, tooltip_text="切换账户")
+        self.account_dropdown.connect("notify::selected", self.on_account_selected)
+        account_box.append(self.account_dropdown)
+        self._updating_accounts = False
+
+        self.change_account_button = Gtk.Button(icon_name="document-edit-symbolic", tooltip_text="修改当前账户的凭据")
         self.change_account_button.connect("clicked", lambda w: self.controller.prompt_for_config())
-        left_box.append(self.change_account_button)
+        account_box.append(self.change_account_button)
+
+        add_account_button = Gtk.Button(icon_name="list-add-symbolic", tooltip_text="添加账户")
+        add_account_button.connect("clicked", lambda w: self.controller.add_account())
+        account_box.append(add_account_button)
 
         # --- Right Pane (Records) ---
         right_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5, margin_start=10, margin_end=10, margin_top=10, margin_bottom=10)
@@ -243,6 +400,10 @@ class AppUI(Adw.ApplicationWindow):
         self.add_button.connect("clicked", lambda w: self.controller.open_add_record_window())
         button_container.append(self.add_button)
 
+        self.import_button = Gtk.Button(label="导入记录")
+        self.import_button.connect("clicked", lambda w: self.controller.open_import_dialog())
+        button_container.append(self.import_button)
+
         self.refresh_records_button = Gtk.Button(label="刷新记录")
         self.refresh_records_button.connect("clicked", lambda w: self.controller.refresh_current_records())
         button_container.append(self.refresh_records_button)
@@ -252,20 +413,48 @@ class AppUI(Adw.ApplicationWindow):
         self.delete_button.connect("clicked", lambda w: self.controller.delete_selected_record())
         button_container.append(self.delete_button)
 
+        self.records_search = Gtk.SearchEntry(placeholder_text="筛选记录 (如 www、type:A proxied:yes、^mail)")
+        self.records_search.connect("search-changed", self.on_records_search_changed)
+        right_box.append(self.records_search)
+
+        # 记录列表与提示信息 (加载中/出错/为空) 放在同一个 Stack 中切换
+        self.records_stack = Gtk.Stack(hexpand=True, vexpand=True)
+        right_box.append(self.records_stack)
+
+        self.records_message = Gtk.Label(wrap=True)
+        self.records_message.add_css_class("dim-label")
+        self.records_stack.add_named(self.records_message, "message")
+
         scrolled_window_records = Gtk.ScrolledWindow(hexpand=True, vexpand=True)
         scrolled_window_records.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        right_box.append(scrolled_window_records)
-
-        self.records_store = Gtk.ListStore(str, str, str, str, str) # id, type, name, content, proxied
-        self.records_tree = Gtk.TreeView(model=self.records_store)
-        self.records_tree.get_selection().connect("changed", self.on_tree_selection_changed)
-        scrolled_window_records.set_child(self.records_tree)
+        self.records_stack.add_named(scrolled_window_records, "list")
+
+        # ColumnView 只为可见行创建控件; 模型按记录 id 增量更新
+        self.records_model = Gio.ListStore(item_type=RecordItem)
+        self.record_items = {}  # record id -> RecordItem
+        self._records_fill_generation = 0
+        # 筛选结果由 RecordSearchIndex 计算, CustomFilter 只需判断 id 是否在结果集合中
+        self.record_index = RecordSearchIndex()
+        self.record_matches = None  # 为 None 时不筛选
+        self.records_filter = Gtk.CustomFilter.new(self._record_filter_func)
+        self.records_filter_model = Gtk.FilterListModel(model=self.records_model, filter=self.records_filter,
+                                                        incremental=True)
+        self.records_view = Gtk.ColumnView(show_column_separators=True)
+        self.records_sort_model = Gtk.SortListModel(model=self.records_filter_model,
+                                                    sorter=self.records_view.get_sorter(), incremental=True)
+        self.records_selection = Gtk.MultiSelection(model=self.records_sort_model)
+        self.records_selection.connect("selection-changed", self.on_records_selection_changed)
+        self.records_view.set_model(self.records_selection)
+        # 双击 (或回车) 编辑该行记录
+        self.records_view.connect("activate", self.on_record_activated)
+        scrolled_window_records.set_child(self.records_view)
 
         # Context menu for records
         self.records_popover = Gtk.PopoverMenu.new_from_model(None)
-        self.records_popover.set_parent(self.records_tree)
+        self.records_popover.set_parent(self.records_view)
         self.records_popover.set_has_arrow(True)
         records_menu = Gio.Menu.new()
+        records_menu.append("编辑记录", "win.edit_record")
         records_menu.append("复制名称", "win.copy_name")
         records_menu.append("复制内容", "win.copy_content")
         self.records_popover.set_menu_model(records_menu)
@@ -273,23 +462,27 @@ class AppUI(Adw.ApplicationWindow):
         records_gesture = Gtk.GestureClick.new()
         records_gesture.set_button(Gdk.BUTTON_SECONDARY)
         records_gesture.connect("pressed", self.on_records_right_click)
-        self.records_tree.add_controller(records_gesture)
+        self.records_view.add_controller(records_gesture)
 
         # Actions for copying
         self.add_action_with_callback("copy_domain", self.on_copy_domain)
         self.add_action_with_callback("copy_name", self.on_copy_name)
         self.add_action_with_callback("copy_content", self.on_copy_content)
-
-        columns = [("类型", 60, False), ("名称", 150, True), ("内容", 200, True), ("代理", 60, False)]
-        for i, (title, width, expand) in enumerate(columns):
-            renderer = Gtk.CellRendererText()
-            renderer.set_property("ellipsize", Pango.EllipsizeMode.END)
-            column = Gtk.TreeViewColumn(title, renderer, text=i + 1)
+        self.add_action_with_callback("edit_record", lambda action, param: self.controller.open_edit_record_window())
+
+        columns = [("类型", "rtype", 60, False), ("名称", "name", 150, True), ("内容", "content", 200, True), ("代理", "proxied", 60, False)]
+        for title, prop, width, expand in columns:
+            factory = Gtk.SignalListItemFactory()
+            factory.connect("setup", self.on_record_cell_setup)
+            factory.connect("bind", self.on_record_cell_bind, prop)
+            factory.connect("unbind", self.on_record_cell_unbind)
+            column = Gtk.ColumnViewColumn(title=title, factory=factory)
             column.set_resizable(True)
             column.set_expand(expand)
-            column.set_min_width(width)
-            column.set_sort_column_id(i + 1)
-            self.records_tree.append_column(column)
+            if not expand:
+                column.set_fixed_width(width)
+            column.set_sorter(Gtk.StringSorter.new(Gtk.PropertyExpression.new(RecordItem, None, prop)))
+            self.records_view.append_column(column)
 
         self.clear_ui()
         self.present()
@@ -299,30 +492,64 @@ class AppUI(Adw.ApplicationWindow):
         action.connect("activate", callback)
         self.add_action(action)
 
+    def on_domain_row_setup(self, factory, list_item):
+        label = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END, margin_top=6, margin_bottom=6, margin_start=6)
+        list_item.set_child(label)
+
+    def on_domain_row_bind(self, factory, list_item):
+        label = list_item.get_child()
+        label.list_item = list_item
+        label.set_text(list_item.get_item().name)
+
     def on_domain_right_click(self, gesture, n_press, x, y):
-        row = self.domain_listbox.get_row_at_y(int(y))
-        if row:
-            self.domain_listbox.select_row(row)
+        widget = self.domain_listview.pick(x, y, Gtk.PickFlags.DEFAULT)
+        while widget is not None and getattr(widget, "list_item", None) is None:
+            widget = widget.get_parent()
+        if widget is not None:
+            self.domain_selection.set_selected(widget.list_item.get_position())
             rect = Gdk.Rectangle()
             rect.x, rect.y, rect.width, rect.height = int(x), int(y), 1, 1
             self.domain_popover.set_pointing_to(rect)
             self.domain_popover.popup()
 
+    def on_record_cell_setup(self, factory, list_item):
+        label = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END)
+        list_item.set_child(label)
+
+    def on_record_cell_bind(self, factory, list_item, prop):
+        label = list_item.get_child()
+        label.list_item = list_item
+        label.binding = list_item.get_item().bind_property(prop, label, "label", GObject.BindingFlags.SYNC_CREATE)
+
+    def on_record_cell_unbind(self, factory, list_item):
+        label = list_item.get_child()
+        if getattr(label, "binding", None):
+            label.binding.unbind()
+            label.binding = None
+        label.list_item = None
+
     def on_records_right_click(self, gesture, n_press, x, y):
-        path_info = self.records_tree.get_path_at_pos(int(x), int(y))
-        if path_info:
-            path, col, cell_x, cell_y = path_info
-            self.records_tree.get_selection().select_path(path)
+        # 找到指针下的单元格, 若该行未选中则只选中该行
+        widget = self.records_view.pick(x, y, Gtk.PickFlags.DEFAULT)
+        while widget is not None and getattr(widget, "list_item", None) is None:
+            widget = widget.get_parent()
+        if widget is not None:
+            position = widget.list_item.get_position()
+            if not self.records_selection.is_selected(position):
+                self.records_selection.select_item(position, True)
             rect = Gdk.Rectangle()
             rect.x, rect.y, rect.width, rect.height = int(x), int(y), 1, 1
             self.records_popover.set_pointing_to(rect)
             self.records_popover.popup()
 
+    def on_record_activated(self, view, position):
+        self.records_selection.select_item(position, True)
+        self.controller.open_edit_record_window()
+
     def on_copy_domain(self, action, param):
-        row = self.domain_listbox.get_selected_row()
-        if row:
-            # AdwActionRow title
-            self.get_display().get_clipboard().set(row.get_title())
+        item = self.domain_selection.get_selected_item()
+        if item:
+            self.get_display().get_clipboard().set(item.name)
 
     def on_copy_name(self, action, param):
         _, record_name = self.get_selected_record_info()
@@ -330,25 +557,34 @@ class AppUI(Adw.ApplicationWindow):
             self.get_display().get_clipboard().set(record_name)
 
     def on_copy_content(self, action, param):
-        model, treeiter = self.records_tree.get_selection().get_selected()
-        if treeiter:
-            content = model[treeiter][3]
-            self.get_display().get_clipboard().set(content)
+        items = self.get_selected_record_items()
+        if items:
+            self.get_display().get_clipboard().set(items[0].content)
+
+    def update_account_list(self, names, current):
+        # 更新账户下拉框, 不触发切换
+        self._updating_accounts = True
+        try:
+            self.account_model.splice(0, self.account_model.get_n_items(), names)
+            self.account_dropdown.set_selected(names.index(current) if current in names else Gtk.INVALID_LIST_POSITION)
+        finally:
+            self._updating_accounts = False
+
+    def on_account_selected(self, dropdown, pspec):
+        if self._updating_accounts: return
+        item = dropdown.get_selected_item()
+        if item is not None:
+            self.controller.switch_account(item.get_string())
 
     def clear_ui(self):
-        # Only remove ListBoxRow children to avoid removing popovers or other internal widgets
-        child = self.domain_listbox.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            if isinstance(child, Gtk.ListBoxRow):
-                self.domain_listbox.remove(child)
-            child = next_child
-            
-        self.records_store.clear()
+        self.domain_model.remove_all()
+        self.domain_stack.set_visible_child_name("list")
+        self.show_records_message("")
         self.set_record_buttons_state(False)
 
     def set_record_buttons_state(self, active):
         self.add_button.set_sensitive(active)
+        self.import_button.set_sensitive(active)
         self.refresh_records_button.set_sensitive(active)
         self.delete_button.set_sensitive(False)
 
@@ -358,54 +594,135 @@ class AppUI(Adw.ApplicationWindow):
     def update_domain_list(self, zones, error):
         self.clear_ui()
         if error:
-            row = Adw.ActionRow(title=f"加载失败: {error}")
-            self.domain_listbox.append(row)
+            self.domain_message.set_text(f"加载失败: {error}")
+            self.domain_stack.set_visible_child_name("message")
         elif not zones:
-            row = Adw.ActionRow(title="未找到任何域名")
-            self.domain_listbox.append(row)
+            self.domain_message.set_text("未找到任何域名")
+            self.domain_stack.set_visible_child_name("message")
         else:
-            for zone in zones:
-                row = Adw.ActionRow(title=zone['name'])
-                self.domain_listbox.append(row)
-
-    def on_domain_row_selected(self, listbox, row):
-        if row:
-            # We need to find the index of the row
-            idx = 0
-            iter_row = listbox.get_first_child()
-            while iter_row:
-                if iter_row == row:
-                    self.controller.on_domain_selected(idx)
-                    break
-                iter_row = iter_row.get_next_sibling()
-                idx += 1
+            self.domain_model.splice(0, 0, [ZoneItem(zone['name'], i) for i, zone in enumerate(zones)])
+
+    def on_domain_search_changed(self, entry):
+        self.domain_filter.set_search(entry.get_text().strip())
+
+    def on_domain_selection_changed(self, selection, pspec):
+        item = selection.get_selected_item()
+        if item is not None:
+            self.controller.on_domain_selected(item.index)
+
+    def show_records_message(self, text):
+        # 清空记录列表并显示提示信息
+        self._records_fill_generation += 1
+        self.records_model.remove_all()
+        self.record_items.clear()
+        self.record_index.sync(())
+        self.records_message.set_text(text)
+        self.records_stack.set_visible_child_name("message")
 
     def show_loading_records(self):
-        self.records_store.clear()
-        self.records_store.append(["loading", "", "正在查询，请稍候...", "", ""])
+        self.show_records_message("正在查询，请稍候...")
 
     def update_dns_records_list(self, records, error):
-        self.records_store.clear()
+        # 按记录 id 比较, 只删除/更新/插入有变化的行
         if error:
-            self.records_store.append(["error", "错误", f"加载记录失败: {error}", "", ""])
-        elif not records:
-            self.records_store.append(["empty", "", "该域名下没有解析记录。", "", ""])
+            self.show_records_message(f"加载记录失败: {error}")
+            return
+        if not records:
+            self.show_records_message("该域名下没有解析记录。")
+            return
+
+        self._records_fill_generation += 1
+        self.records_stack.set_visible_child_name("list")
+        new_records = {r['id']: r for r in records}
+        # 先更新筛选结果, 随后插入的行会直接按新结果过滤
+        self.record_index.sync(records)
+        self._apply_records_filter()
+
+        if not any(rid in new_records for rid in self.record_items):
+            self.records_model.remove_all()
+            self.record_items.clear()
         else:
-            for r in records:
-                self.records_store.append([r['id'], r['type'], r['name'], r['content'], "是" if r.get('proxied') else "否"])
+            removed = [pos for pos, item in enumerate(self.records_model) if item.rid not in new_records]
+            # 从后往前按连续区间删除, 前面的位置不受影响
+            while removed:
+                end = removed.pop()
+                start = end
+                while removed and removed[-1] == start - 1:
+                    start = removed.pop()
+                for pos in range(start, end + 1):
+                    self.record_items.pop(self.records_model.get_item(pos).rid, None)
+                self.records_model.splice(start, end - start + 1, [])
+            for rid, item in self.record_items.items():
+                if item.record != new_records[rid]:
+                    item.update(new_records[rid])
+
+        inserted = [RecordItem(r) for r in records if r['id'] not in self.record_items]
+        self._append_record_items(inserted[:self.RECORDS_CHUNK_SIZE])
+        if len(inserted) > self.RECORDS_CHUNK_SIZE:
+            self._fill_records_when_idle(inserted[self.RECORDS_CHUNK_SIZE:], self._records_fill_generation)
+
+    def _append_record_items(self, items):
+        self.records_model.splice(self.records_model.get_n_items(), 0, items)
+        for item in items:
+            self.record_items[item.rid] = item
+
+    def _fill_records_when_idle(self, items, generation):
+        # 剩余记录在主循环空闲时分批加入; 期间列表再次更新则放弃本次填充
+        chunks = iter(range(0, len(items), self.RECORDS_CHUNK_SIZE))
+
+        def fill_next_chunk():
+            if generation != self._records_fill_generation:
+                return False
+            start = next(chunks, None)
+            if start is None:
+                return False
+            self._append_record_items(items[start:start + self.RECORDS_CHUNK_SIZE])
+            return True
+
+        GLib.idle_add(fill_next_chunk)
+
+    def _record_filter_func(self, item):
+        return self.record_matches is None or item.rid in self.record_matches
+
+    def _apply_records_filter(self):
+        query = self.records_search.get_text().strip()
+        matches = set(self.record_index.search(query)) if query else None
+        if matches is None and self.record_matches is None:
+            return
+        self.record_matches = matches
+        self.records_filter.changed(Gtk.FilterChange.DIFFERENT)
+
+    def on_records_search_changed(self, entry):
+        self._apply_records_filter()
+
+    def on_records_selection_changed(self, selection, position, n_items):
+        self.controller.on_record_selection_change(bool(self.get_selected_record_items()))
+
+    def get_selected_record_items(self):
+        bitset = self.records_selection.get_selection()
+        return [self.records_sort_model.get_item(bitset.get_nth(i)) for i in range(bitset.get_size())]
 
-    def on_tree_selection_changed(self, selection):
-        model, treeiter = selection.get_selected()
-        selection_exists = treeiter is not None and model[treeiter][0] not in ["empty", "error", "loading"]
-        self.controller.on_record_selection_change(selection_exists)
+    def get_selected_records_info(self):
+        # 返回所有选中记录的 (id, name) 列表
+        return [(item.rid, item.name) for item in self.get_selected_record_items()]
 
     def get_selected_record_info(self):
-        model, treeiter = self.records_tree.get_selection().get_selected()
-        if treeiter is not None:
-            record_id = model[treeiter][0]
-            record_name = model[treeiter][2]
-            return record_id, record_name
-        return None, None
+        selected = self.get_selected_records_info()
+        return selected[0] if selected else (None, None)
+
+    def choose_import_file(self, on_chosen):
+        # 选择要导入的 BIND 区域文件或 CSV, 选中后以文件路径调用 on_chosen
+        dialog = Gtk.FileDialog(title="选择要导入的区域文件 (BIND / CSV)")
+
+        def on_open_finish(dialog, res):
+            try:
+                file = dialog.open_finish(res)
+            except GLib.Error:
+                return  # 用户取消
+            if file and file.get_path():
+                on_chosen(file.get_path())
+
+        dialog.open(self, None, on_open_finish)
 
     def set_status_message(self, text):
         self.status_label.set_text(text)
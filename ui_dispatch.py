@@ -0,0 +1,64 @@
+# ui_dispatch.py
+import bisect
+import threading
+import time
+import traceback
+from collections import deque
+
+class MainLoopDispatcher:
+    """
+    将工作线程的结果交给 UI 主循环执行, 取代定时轮询:
+    队列由空变为非空时才通过 schedule (如 GLib.idle_add) 唤醒主循环一次,
+    主循环在同一次回调中执行当前积压的全部回调, 一批完成的任务只占用一帧。
+    同时统计从 post 到回调执行之间的延迟分布。
+    """
+    # 延迟直方图的桶上限 (毫秒), 最后一个桶收集更大的值
+    LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+    def __init__(self, schedule, clock=time.perf_counter):
+        self._schedule = schedule
+        self._clock = clock
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._histogram = [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+        self._count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def post(self, callback, kwargs=None):
+        """可在任意线程调用: 安排 callback(**kwargs) 在主循环中执行"""
+        with self._lock:
+            self._pending.append((callback, kwargs or {}, self._clock()))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self._flush)
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, deque()
+            self._scheduled = False
+        for callback, kwargs, posted_at in batch:
+            self._record_latency((self._clock() - posted_at) * 1000)
+            try:
+                callback(**kwargs)
+            except Exception:  # 单个回调出错不影响同一批的其他回调
+                traceback.print_exc()
+        return False  # 只执行一次, 下次有结果时重新安排
+
+    def _record_latency(self, latency_ms):
+        self._histogram[bisect.bisect_left(self.LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self._count += 1
+        self._total_ms += latency_ms
+        self._max_ms = max(self._max_ms, latency_ms)
+
+    def latency_stats(self):
+        """返回延迟直方图 {"<=1ms": n, ..., ">500ms": n} 以及次数、平均值和最大值"""
+        labels = [f"<={b}ms" for b in self.LATENCY_BUCKETS_MS] + [f">{self.LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "histogram": dict(zip(labels, self._histogram)),
+            "count": self._count,
+            "mean_ms": self._total_ms / self._count if self._count else 0.0,
+            "max_ms": self._max_ms,
+        }
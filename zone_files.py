@@ -0,0 +1,329 @@
+# zone_files.py
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 导入时忽略的记录类型, SOA 由 Cloudflare 自行管理
+SKIPPED_TYPES = {"SOA"}
+# 这些类型的内容是域名, 比较和保存时统一为小写且去掉末尾的点
+HOSTNAME_TYPES = {"CNAME", "NS", "MX", "PTR"}
+# 可以开启代理的记录类型
+PROXIABLE_TYPES = {"A", "AAAA", "CNAME"}
+# 区域文件中以优先级开头的记录类型及其含优先级的字段数; API 中优先级是单独的字段
+PRIORITY_FIELDS = {"MX": 2, "SRV": 4, "URI": 3}
+
+DNS_CLASSES = {"IN", "CH", "HS", "CS"}
+
+def normalize_name(name: str, origin: str) -> str:
+    """将区域文件中的名称 (@, 相对名称, 绝对名称) 转为不带末尾点的小写完整域名"""
+    name = name.strip()
+    if name in ("", "@"):
+        return origin
+    if name.endswith("."):
+        return name[:-1].lower()
+    return f"{name}.{origin}".lower() if origin else name.lower()
+
+def make_record(record_type, name, content, ttl=1, proxied=False, priority=None):
+    """构造与 Cloudflare API 字段一致的记录字典"""
+    record_type = record_type.upper()
+    record = {
+        "type": record_type,
+        "name": name,
+        "content": content,
+        "ttl": int(ttl) if ttl else 1,
+        "proxied": bool(proxied) and record_type in PROXIABLE_TYPES,
+    }
+    if priority is not None:
+        record["priority"] = int(priority)
+    return record
+
+def _tokenize(line: str):
+    """按空白拆分一行, 保留引号内的空格并分离 ';' 之后的注释。返回 (tokens, quoted 标记, 注释)"""
+    tokens, quoted, comment = [], [], ""
+    i, n = 0, len(line)
+    while i < n:
+        ch = line[i]
+        if ch in " \t\r\n":
+            i += 1
+        elif ch == ";":
+            comment = line[i + 1:].strip()
+            break
+        elif ch in "()":
+            tokens.append(ch)
+            quoted.append(False)
+            i += 1
+        elif ch == '"':
+            j = i + 1
+            buf = []
+            while j < n and line[j] != '"':
+                if line[j] == "\\" and j + 1 < n:
+                    buf.append(line[j + 1])
+                    j += 2
+                    continue
+                buf.append(line[j])
+                j += 1
+            tokens.append("".join(buf))
+            quoted.append(True)
+            i = j + 1
+        else:
+            j = i
+            while j < n and line[j] not in " \t\r\n;()\"":
+                j += 1
+            tokens.append(line[i:j])
+            quoted.append(False)
+            i = j
+    return tokens, quoted, comment
+
+def _logical_lines(lines):
+    """合并括号跨行的条目, 逐条产出 (是否以空白开头, tokens, quoted 标记, 注释列表)"""
+    pending, pending_quoted, comments, depth, indented = [], [], [], 0, False
+    for line in lines:
+        tokens, quoted, comment = _tokenize(line)
+        if depth == 0:
+            if not tokens:
+                continue
+            indented = line[:1] in (" ", "\t")
+        if comment:
+            comments.append(comment)
+        for token, is_quoted in zip(tokens, quoted):
+            if not is_quoted and token == "(":
+                depth += 1
+            elif not is_quoted and token == ")":
+                depth = max(0, depth - 1)
+            else:
+                pending.append(token)
+                pending_quoted.append(is_quoted)
+        if depth == 0:
+            if pending:
+                yield indented, pending, pending_quoted, comments
+            pending, pending_quoted, comments = [], [], []
+
+def _is_ttl(token: str) -> bool:
+    return token[:1].isdigit() and all(ch.isdigit() or ch in "smhdwSMHDW" for ch in token)
+
+def _parse_ttl(token: str) -> int:
+    """解析 TTL, 支持 1h30m 这类 BIND 写法"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    total, num = 0, ""
+    for ch in token.lower():
+        if ch.isdigit():
+            num += ch
+        else:
+            total += int(num or 0) * units.get(ch, 1)
+            num = ""
+    return total + int(num or 0)
+
+def parse_bind(lines, origin: str = ""):
+    """
+    以流的方式解析 BIND 区域文件, 逐条产出记录字典。
+    支持 $ORIGIN / $TTL、@、相对名称、省略所有者 (沿用上一条)、括号跨行和引号内的 TXT。
+    行尾注释 "; proxied" (导出时写入) 表示该记录开启代理。
+    """
+    origin = origin.rstrip(".").lower()
+    default_ttl = 1
+    last_owner = origin
+    for indented, tokens, quoted, comments in _logical_lines(lines):
+        directive = tokens[0].upper()
+        if directive == "$ORIGIN" and len(tokens) > 1:
+            origin = normalize_name(tokens[1], origin)
+            continue
+        if directive == "$TTL" and len(tokens) > 1:
+            default_ttl = _parse_ttl(tokens[1])
+            continue
+        if directive.startswith("$"):
+            continue
+
+        pos = 0
+        if indented:
+            owner = last_owner
+        else:
+            owner = normalize_name(tokens[0], origin)
+            pos = 1
+        last_owner = owner
+
+        ttl = default_ttl
+        # TTL 和类别可以任意顺序出现在类型之前
+        while pos < len(tokens) - 1:
+            token = tokens[pos]
+            if token.upper() in DNS_CLASSES:
+                pos += 1
+            elif _is_ttl(token):
+                ttl = _parse_ttl(token)
+                pos += 1
+            else:
+                break
+        if pos >= len(tokens) - 1:
+            continue
+
+        record_type = tokens[pos].upper()
+        rdata, rdata_quoted = tokens[pos + 1:], quoted[pos + 1:]
+        if record_type in SKIPPED_TYPES:
+            continue
+
+        priority = None
+        if record_type in PRIORITY_FIELDS and len(rdata) >= PRIORITY_FIELDS[record_type]:
+            priority, rdata, rdata_quoted = rdata[0], rdata[1:], rdata_quoted[1:]
+        if record_type == "SRV" and len(rdata) == 3 and rdata[2] != ".":
+            rdata = rdata[:2] + [normalize_name(rdata[2], origin)]
+        if record_type == "TXT":
+            content = "".join(rdata)
+        elif record_type in HOSTNAME_TYPES:
+            content = normalize_name(rdata[0], origin)
+        else:
+            content = " ".join(f'"{t}"' if q else t for t, q in zip(rdata, rdata_quoted))
+        proxied = "proxied" in comments
+        yield make_record(record_type, owner, content, ttl, proxied, priority)
+
+def parse_csv(lines, origin: str = ""):
+    """
+    以流的方式解析 CSV, 首行为表头, 列: type,name,content[,ttl,proxied,priority]。
+    name 可以是 @、相对名称或完整域名。
+    """
+    origin = origin.rstrip(".").lower()
+    for row in csv.DictReader(lines):
+        row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k is not None}
+        if not row.get("type") or row["type"].upper() in SKIPPED_TYPES:
+            continue
+        name = row.get("name", "")
+        if name and not name.endswith(".") and (name.lower() == origin or name.lower().endswith("." + origin)):
+            name += "."
+        record_type = row["type"].upper()
+        content = row.get("content", "")
+        priority = row.get("priority") or None
+        fields = content.split()
+        if priority is None and record_type in PRIORITY_FIELDS and len(fields) >= PRIORITY_FIELDS[record_type]:
+            # 未填 priority 列时, 内容可以按区域文件的写法以优先级开头
+            priority, content = fields[0], content.split(None, 1)[1]
+            fields = fields[1:]
+        if record_type in HOSTNAME_TYPES:
+            content = content.rstrip(".").lower()
+        elif record_type == "SRV" and len(fields) == 3 and fields[2] != ".":
+            content = " ".join(fields[:2] + [fields[2].rstrip(".").lower()])
+        proxied = row.get("proxied", "").lower() in ("1", "true", "yes", "y", "是")
+        yield make_record(record_type, normalize_name(name, origin), content,
+                          row.get("ttl") or 1, proxied, priority)
+
+def parse_ndjson(lines, origin: str = ""):
+    """以流的方式解析 NDJSON (每行一条 API 格式的记录, 即 export 的输出)"""
+    origin = origin.rstrip(".").lower()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if record.get("type", "").upper() in SKIPPED_TYPES:
+            continue
+        name = record.get("name", "")
+        if not name.endswith(".") and (name.lower() == origin or name.lower().endswith("." + origin)):
+            name += "."
+        yield make_record(record["type"], normalize_name(name, origin), record.get("content", ""),
+                          record.get("ttl", 1), record.get("proxied", False), record.get("priority"))
+
+NDJSON_EXTENSIONS = {".ndjson", ".jsonl", ".json"}
+
+def iter_records_file(path: str, origin: str = ""):
+    """根据扩展名选择解析器, 逐条产出文件中的记录"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        parser = parse_csv
+    elif ext in NDJSON_EXTENSIONS:
+        parser = parse_ndjson
+    else:
+        parser = parse_bind
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from parser(f, origin)
+
+TXT_STRING_LIMIT = 255   # DNS character-string 的最大字节数
+
+def _split_utf8(data: bytes, limit: int = TXT_STRING_LIMIT):
+    """按字节拆分 UTF-8 文本, 每段不超过 limit 字节, 且不会切断多字节字符"""
+    chunks, start = [], 0
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while start < end < len(data) and data[end] & 0xC0 == 0x80:  # 续字节, 向前退到字符起点
+            end -= 1
+        chunks.append(data[start:end])
+        start = end
+    return chunks
+
+def _quote_txt(content: str) -> str:
+    """TXT 内容按 255 字节拆分为多个带引号的字符串; 先拆分原始内容再转义, 转义序列不会被拆开"""
+    if len(content) >= 2 and content[0] == content[-1] == '"':
+        return content
+    chunks = [chunk.decode("utf-8") for chunk in _split_utf8(content.encode("utf-8"))] or [""]
+    return " ".join('"' + chunk.replace("\\", "\\\\").replace('"', '\\"') + '"' for chunk in chunks)
+
+def format_bind_record(record: dict) -> str:
+    """将 API 返回的记录格式化为一行 BIND 记录 (使用带末尾点的完整域名)"""
+    record_type = record["type"]
+    content = record.get("content", "")
+    if record_type == "TXT":
+        content = _quote_txt(content)
+    elif record_type in HOSTNAME_TYPES:
+        content = content.rstrip(".") + "."
+    elif record_type == "SRV":
+        fields = content.split()
+        if len(fields) == 3 and fields[2] != ".":
+            content = " ".join(fields[:2] + [fields[2].rstrip(".") + "."])
+    if record.get("priority") is not None and record_type in PRIORITY_FIELDS:
+        content = f"{record['priority']} {content}"
+    proxied = " ; proxied" if record.get("proxied") else ""
+    return f"{record['name'].rstrip('.')}.\t{record.get('ttl', 1)}\tIN\t{record_type}\t{content}{proxied}\n"
+
+def format_ndjson_record(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+EXPORT_FORMATS = {
+    "bind": (".zone", format_bind_record),
+    "ndjson": (".ndjson", format_ndjson_record),
+}
+
+def export_zone(api, zone: dict, path: str, fmt: str = "bind"):
+    """
+    将区域的全部记录导出到文件, 每到达一页就写入并刷新, 内存占用与区域大小无关。
+    先写入临时文件, 完成后再替换目标文件, 失败时不会留下残缺的备份。
+    返回 (记录条数, error)。
+    """
+    _, formatter = EXPORT_FORMATS[fmt]
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if fmt == "bind":
+                f.write(f"; {zone['name']} 由 Cloudflare DNS Manager 导出, TTL 1 表示自动\n")
+                f.write(f"$ORIGIN {zone['name']}.\n")
+            for records, error in api.iter_dns_records(zone['id']):
+                if error:
+                    raise IOError(error)
+                f.writelines(formatter(r) for r in records)
+                f.flush()
+                count += len(records)
+        os.replace(tmp_path, path)
+        return count, None
+    except (OSError, IOError) as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None, f"导出 {zone['name']} 失败: {e}"
+
+def export_zones(api, zones, out_dir: str, fmt: str = "bind", workers: int = 4, on_done=None):
+    """
+    并发导出多个区域, 每个区域一个文件 (out_dir/<域名><扩展名>)。
+    on_done(zone, count, error) 在每个区域完成后调用; 返回 {zone_name: (count, error)}。
+    """
+    ext, _ = EXPORT_FORMATS[fmt]
+    os.makedirs(out_dir, exist_ok=True)
+    results = {}
+
+    def export_one(zone):
+        count, error = export_zone(api, zone, os.path.join(out_dir, zone['name'] + ext), fmt)
+        if on_done:
+            on_done(zone, count, error)
+        return zone['name'], (count, error)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for name, outcome in executor.map(export_one, zones):
+            results[name] = outcome
+    return results